@@ -7,14 +7,34 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 
 @author:  neilswainston
 '''
+# pylint: disable=broad-except
 # pylint: disable=too-many-arguments
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+import traceback
+
 from synbiochem.utils import dna_utils
 from synbiochem.utils.ice_utils import DNAWriter, ICEEntry
 from synbiochem.utils.net_utils import NetworkError
 
+from ice import ice_cache
 from pathway_genie.utils import PathwayThread
 
 
+# Maximum number of concurrent ICE writes per job:
+_MAX_ICE_WRITES = int(os.environ.get('PATHWAY_GENIE_MAX_ICE_WRITES', 8))
+
+# Number of attempts at ICE requests failing with transient errors:
+_MAX_ATTEMPTS = 3
+
+# Delay, in seconds, before first retry (doubling for each retry):
+_RETRY_DELAY = 1.0
+
+# HTTP statuses of transient errors:
+_TRANSIENT_STATUSES = [408, 429, 500, 502, 503, 504]
+
+
 class IceThread(PathwayThread):
     '''Runs a save-to-ICE job.'''
 
@@ -34,28 +54,37 @@ class IceThread(PathwayThread):
 
     def run(self):
         '''Saves results.'''
-        keys = ['part', 'plasmid', 'strain']
+        iteration = 0
+        futures = []
 
         try:
-            iteration = 0
-
             self._fire_designs_event(
                 'running', iteration, 'Connecting to ICE...')
 
             url = self._query['ice']['url']
             self._query['ice']['url'] = url[:-1] if url[-1] == '/' else url
 
-            for result in self._query['designs']:
-                # Append links to results:
-                links = {key: {'link': url + '/entry/' + str(entry_id),
-                               'ice_id': str(entry_id)}
-                         for key, entry_id in zip(keys,
-                                                  self.__write_design(result))
-                         if entry_id}
+            # Resolve entries and groups shared by all designs once:
+            shared = self.__get_shared()
+
+            with ThreadPoolExecutor(_MAX_ICE_WRITES) as executor:
+                try:
+                    # Submit designs in turn (as DNAWriter reuses submitted
+                    # parts), writing their plasmids and strains
+                    # concurrently:
+                    for result in self._query['designs']:
+                        if self._cancelled:
+                            break
+
+                        ice_id, typ = self.__dna_writer.submit(result)
+                        futures.append(executor.submit(self.__write_design,
+                                                       ice_id, typ, shared))
+                        iteration = self.__collect(futures, url, False)
 
-                self._results.append(links)
-                iteration += 1
-                self._fire_designs_event('running', iteration, 'Saving...')
+                    iteration = self.__collect(futures, url, True)
+                finally:
+                    for future in futures:
+                        future.cancel()
 
             if self._cancelled:
                 self._fire_designs_event('cancelled', iteration,
@@ -64,44 +93,88 @@ class IceThread(PathwayThread):
                 self._fire_designs_event('finished', iteration,
                                          message='Job completed')
         except NetworkError as err:
-            self._fire_designs_event('error', iteration,
+            self._fire_designs_event('error', len(self._results),
                                      message=err.get_text())
-
-    def __write_design(self, result):
+        except Exception:
+            self._fire_designs_event('error', len(self._results),
+                                     message=traceback.format_exc())
+
+    def __get_shared(self):
+        '''Gets plasmid backbone, host strain and group ids, as shared by
+        all designs.'''
+        shared = {key: _retry(ice_cache.get_ice_entry, self.__ice_client,
+                              self._query['ice'][key])
+                  if self._query['ice'].get(key, None) else None
+                  for key in ['plasmid', 'strain']}
+
+        shared['groups'] = _retry(ice_cache.get_groups, self.__ice_client) \
+            if self.__group_names else None
+
+        return shared
+
+    def __collect(self, futures, url, wait):
+        '''Collects results of written designs in order, firing an event for
+        each, and returns the number collected.'''
+        iteration = len(self._results)
+
+        while iteration < len(futures) and \
+                (wait or futures[iteration].done()):
+            keys = ['part', 'plasmid', 'strain']
+
+            # Append links to results:
+            links = {key: {'link': url + '/entry/' + str(entry_id),
+                           'ice_id': str(entry_id)}
+                     for key, entry_id in zip(keys,
+                                              futures[iteration].result())
+                     if entry_id}
+
+            self._results.append(links)
+            iteration += 1
+            self._fire_designs_event('running', iteration, 'Saving...')
+
+        return iteration
+
+    def __write_design(self, ice_id, typ, shared):
         '''Write an individual design.'''
-        ice_id, typ = self.__dna_writer.submit(result)
+        plasmid = None
         plasmid_id = ice_id if typ == 'PLASMID' else None
         strain_id = None
 
-        if typ == 'PART' and self._query['ice'].get('plasmid', None):
+        if typ == 'PART' and shared['plasmid']:
             # Write plasmid.
             plasmid, _, _ = \
                 write_ice_entry(self.__ice_client,
                                 ice_id,
-                                self._query['ice']['plasmid'],
+                                shared['plasmid'],
                                 'PLASMID',
                                 True,
-                                self.__group_names)
+                                self.__group_names,
+                                shared['groups'])
             plasmid_id = plasmid.get_ice_id()
 
-        if plasmid_id and self._query['ice'].get('strain', None):
+        if plasmid_id and shared['strain']:
             # Write strain.
             strain, _, _ = \
                 write_ice_entry(self.__ice_client,
-                                plasmid_id,
-                                self._query['ice']['strain'],
+                                plasmid if plasmid else plasmid_id,
+                                shared['strain'],
                                 'STRAIN',
                                 False,
-                                self.__group_names)
-            strain_id = strain.get_ice_id()\
+                                self.__group_names,
+                                shared['groups'])
+            strain_id = strain.get_ice_id()
 
         return ice_id, plasmid_id, strain_id
 
 
-def write_ice_entry(ice_client, ice_id1, ice_id2, typ, write_seq, group_names):
-    '''Write a composite ICE entry (part in plasmid, or plasmid in strain).'''
-    comp1 = ice_client.get_ice_entry(ice_id1)
-    comp2 = ice_client.get_ice_entry(ice_id2)
+def write_ice_entry(ice_client, ice_id1, ice_id2, typ, write_seq, group_names,
+                    groups=None):
+    '''Write a composite ICE entry (part in plasmid, or plasmid in strain).
+
+    Components may be given as ICE ids or, if already resolved, as ICEEntry
+    objects, and groups as a previously-retrieved mapping of names to ids.'''
+    comp1 = _get_ice_entry(ice_client, ice_id1)
+    comp2 = _get_ice_entry(ice_client, ice_id2)
 
     name = comp1.get_metadata()['name'] + \
         ' (' + comp2.get_metadata()['name'] + ')'
@@ -114,6 +187,7 @@ def write_ice_entry(ice_client, ice_id1, ice_id2, typ, write_seq, group_names):
     if taxonomy:
         product.set_parameter('Taxonomy', taxonomy)
 
+    # Creation of entries and links is not idempotent, so is not retried:
     ice_client.set_ice_entry(product)
     ice_client.add_link(product.get_ice_id(), comp1.get_ice_id())
     ice_client.add_link(product.get_ice_id(), comp2.get_ice_id())
@@ -122,13 +196,42 @@ def write_ice_entry(ice_client, ice_id1, ice_id2, typ, write_seq, group_names):
         product.set_dna(dna_utils.concat(
             [comp1.get_dna(), comp2.get_dna()]))
 
-    ice_client.set_ice_entry(product)
+    _retry(ice_client.set_ice_entry, product)
+
+    # Cached components are now linked to product, so are stale:
+    ice_cache.invalidate(ice_client, comp1.get_ice_id())
+    ice_cache.invalidate(ice_client, comp2.get_ice_id())
 
     if group_names:
-        groups = ice_client.get_groups()
+        if groups is None:
+            groups = _retry(ice_cache.get_groups, ice_client)
 
         for group_name in group_names:
-            ice_client.add_permission(product.get_ice_id(),
-                                      groups[group_name])
+            _retry(ice_client.add_permission, product.get_ice_id(),
+                   groups[group_name])
 
     return product, comp1, comp2
+
+
+def _get_ice_entry(ice_client, ice_entry):
+    '''Gets (possibly cached) ICE entry, unless already resolved.'''
+    if isinstance(ice_entry, ICEEntry):
+        return ice_entry
+
+    return _retry(ice_cache.get_ice_entry, ice_client, ice_entry)
+
+
+def _retry(func, *args):
+    '''Calls (idempotent) func, retrying with backoff upon transient network
+    errors.'''
+    for attempt in range(_MAX_ATTEMPTS):
+        try:
+            return func(*args)
+        except NetworkError as err:
+            if attempt == _MAX_ATTEMPTS - 1 or \
+                    err.get_status() not in _TRANSIENT_STATUSES:
+                raise
+
+            time.sleep(_RETRY_DELAY * 2 ** attempt)
+
+    return None
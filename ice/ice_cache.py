@@ -0,0 +1,129 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+# pylint: disable=broad-except
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+from threading import Lock
+import time
+
+
+# Maximum number of concurrent ICE requests:
+_MAX_ICE_REQUESTS = 8
+
+# Time, in seconds, for which ICE entries and groups are cached:
+_ICE_CACHE_TTL = float(os.environ.get('PATHWAY_GENIE_ICE_CACHE_TTL', 60))
+
+# Maximum number of cached ICE entries and groups:
+_ICE_CACHE_SIZE = int(os.environ.get('PATHWAY_GENIE_ICE_CACHE_SIZE', 1024))
+
+
+class IceCache():
+    '''Short-lived, thread-safe cache of read-mostly ICE data (entries and
+    group ids), held per ICE client, in which concurrent requests for the
+    same data share a single fetch.'''
+
+    def __init__(self, ttl=_ICE_CACHE_TTL, max_size=_ICE_CACHE_SIZE,
+                 max_requests=_MAX_ICE_REQUESTS):
+        self.__ttl = ttl
+        self.__max_size = max_size
+        self.__max_requests = max_requests
+        self.__values = OrderedDict()
+        self.__lock = Lock()
+
+    def get_ice_entry(self, ice_client, ice_id):
+        '''Gets ICE entry.'''
+        return self.__get(ice_client, ('entry', ice_id),
+                          ice_client.get_ice_entry, ice_id)
+
+    def get_ice_entries(self, ice_client, ice_ids):
+        '''Gets ICE entries concurrently, in the order of ice_ids.'''
+        with ThreadPoolExecutor(self.__max_requests) as executor:
+            return list(executor.map(
+                lambda ice_id: self.get_ice_entry(ice_client, ice_id),
+                ice_ids))
+
+    def get_groups(self, ice_client):
+        '''Gets mapping of group names to ids.'''
+        return self.__get(ice_client, ('groups',), ice_client.get_groups)
+
+    def invalidate(self, ice_client, ice_id=None):
+        '''Invalidates cached ICE entry or, if ice_id is None, all data
+        cached for ICE client.'''
+        with self.__lock:
+            if ice_id is None:
+                for key in [key for key in self.__values
+                            if key[0] is ice_client]:
+                    del self.__values[key]
+            else:
+                self.__values.pop((ice_client, ('entry', ice_id)), None)
+
+    def __get(self, ice_client, key, func, *args):
+        '''Gets value, fetching it if not cached.'''
+        key = (ice_client, key)
+
+        with self.__lock:
+            self.__purge()
+            value = self.__values.get(key, None)
+
+            if value is None:
+                future = Future()
+                self.__values[key] = (time.time(), future)
+                fetch = True
+            else:
+                future = value[1]
+                fetch = False
+
+        if fetch:
+            try:
+                future.set_result(func(*args))
+            except Exception as err:
+                # Do not cache failures:
+                with self.__lock:
+                    if self.__values.get(key, (None, None))[1] is future:
+                        del self.__values[key]
+
+                future.set_exception(err)
+
+        return future.result()
+
+    def __purge(self):
+        '''Removes expired or, if full, oldest values.'''
+        expiry = time.time() - self.__ttl
+
+        # Values are ordered by time of fetch:
+        while self.__values and \
+                (len(self.__values) >= self.__max_size or
+                 next(iter(self.__values.values()))[0] < expiry):
+            self.__values.popitem(last=False)
+
+
+_ICE_CACHE = IceCache()
+
+
+def get_ice_entry(ice_client, ice_id):
+    '''Gets ICE entry from process-wide cache.'''
+    return _ICE_CACHE.get_ice_entry(ice_client, ice_id)
+
+
+def get_ice_entries(ice_client, ice_ids):
+    '''Gets ICE entries concurrently from process-wide cache.'''
+    return _ICE_CACHE.get_ice_entries(ice_client, ice_ids)
+
+
+def get_groups(ice_client):
+    '''Gets mapping of group names to ids from process-wide cache.'''
+    return _ICE_CACHE.get_groups(ice_client)
+
+
+def invalidate(ice_client, ice_id=None):
+    '''Invalidates ICE entry, or all data for ICE client, in process-wide
+    cache.'''
+    _ICE_CACHE.invalidate(ice_client, ice_id)
@@ -0,0 +1,150 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import itertools
+import random
+from threading import Lock
+import time
+import unittest
+from unittest import mock
+
+from synbiochem.utils import dna_utils
+from synbiochem.utils.ice_utils import ICEEntry
+
+from ice import ice
+
+
+class _IceClient():
+    '''Stub ICE client, writing entries with random delays.'''
+
+    def __init__(self, fail_name=None):
+        self.__fail_name = fail_name
+        self.__ids = itertools.count(1000)
+        self.__lock = Lock()
+        self.names = {}
+
+    def get_ice_entry(self, ice_id):
+        '''Gets ICE entry.'''
+        return ICEEntry(dna=dna_utils.DNA(seq='ACGT', name=ice_id),
+                        metadata={'id': int(ice_id[3:]),
+                                  'name': ice_id,
+                                  'type': 'PART',
+                                  'parameters': []})
+
+    def set_ice_entry(self, entry):
+        '''Sets ICE entry, creating it if new.'''
+        time.sleep(random.random() * 0.01)
+
+        if entry.get_ice_number() is None:
+            with self.__lock:
+                ice_number = next(self.__ids)
+
+            entry.set_values({'id': ice_number,
+                              'partId': 'SBC%06d' % ice_number,
+                              'recordId': str(ice_number)})
+            self.names[entry.get_ice_id()] = entry.get_metadata()['name']
+
+    def add_link(self, ice_id1, _):
+        '''Links ICE entries.'''
+        if self.names[ice_id1] == self.__fail_name:
+            raise ValueError(ice_id1)
+
+    def get_groups(self):
+        '''Gets mapping of group names to ids.'''
+        return {'group': 1}
+
+    def add_permission(self, ice_id, group_id):
+        '''Adds group permission to ICE entry.'''
+
+
+class _IceClientFactory():
+    '''Stub ICEClientFactory.'''
+
+    def __init__(self, ice_client):
+        self.__ice_client = ice_client
+
+    def get_ice_client(self, *_, **__):
+        '''Gets ICE client.'''
+        return self.__ice_client
+
+
+class _DNAWriter():
+    '''Stub DNAWriter, whose designs are already written.'''
+
+    def __init__(self, _):
+        pass
+
+    def submit(self, dna):
+        '''Submits DNA, returning its ICE id and type.'''
+        return dna['ice_id'], 'PART'
+
+
+class _Listener():
+    '''Listener, retaining events.'''
+
+    def __init__(self):
+        self.events = []
+
+    def event_fired(self, event):
+        '''Responds to event being fired.'''
+        self.events.append(event)
+
+
+class TestIceThread(unittest.TestCase):
+    '''Test class for IceThread.'''
+
+    def test_run(self):
+        '''Tests run method, whose results are in the order of designs.'''
+        ice_client = _IceClient()
+        events = _run(ice_client, 24)
+
+        self.assertEqual(events[-1]['update']['status'], 'finished')
+        self.assertEqual([event['update']['iteration']
+                          for event in events[1:-1]], list(range(1, 25)))
+
+        for idx, links in enumerate(events[-1]['result']):
+            ice_id = 'SBC%06d' % (idx + 1)
+            plasmid_name = ice_client.names[links['plasmid']['ice_id']]
+            strain_name = ice_client.names[links['strain']['ice_id']]
+
+            self.assertEqual(links['part']['ice_id'], ice_id)
+            self.assertEqual(plasmid_name, ice_id + ' (SBC000100)')
+            self.assertEqual(strain_name,
+                             plasmid_name + ' (SBC000200)')
+
+    def test_run_error(self):
+        '''Tests run method, with a failed write.'''
+        events = _run(_IceClient(fail_name='SBC000005 (SBC000100)'), 24)
+
+        self.assertEqual(events[-1]['update']['status'], 'error')
+        self.assertIn('SBC', events[-1]['update']['message'])
+        self.assertEqual(events[-1]['update']['iteration'], 4)
+
+
+def _run(ice_client, num_designs):
+    '''Runs IceThread, returning its events.'''
+    query = {'ice': {'url': 'http://ice/', 'username': 'user',
+                     'password': 'password', 'groups': 'group',
+                     'plasmid': 'SBC000100', 'strain': 'SBC000200'},
+             'designs': [{'ice_id': 'SBC%06d' % (idx + 1)}
+                         for idx in range(num_designs)]}
+
+    listener = _Listener()
+
+    with mock.patch.object(ice, 'DNAWriter', _DNAWriter):
+        thread = ice.IceThread(query, _IceClientFactory(ice_client))
+
+    thread.add_listener(listener)
+    thread.run()
+    return listener.events
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
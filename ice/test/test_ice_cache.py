@@ -0,0 +1,131 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+import random
+import time
+import unittest
+
+from ice.ice_cache import IceCache
+
+
+class _IceClient():
+    '''Stub ICE client, counting requests.'''
+
+    def __init__(self, delay=0.0):
+        self.__delay = delay
+        self.__lock = Lock()
+        self.requests = []
+
+    def get_ice_entry(self, ice_id):
+        '''Gets ICE entry.'''
+        with self.__lock:
+            self.requests.append(ice_id)
+
+        # Vary completion order of concurrent requests:
+        time.sleep(random.random() * self.__delay)
+        return {'ice_id': ice_id, 'version': self.requests.count(ice_id)}
+
+    def get_groups(self):
+        '''Gets mapping of group names to ids.'''
+        with self.__lock:
+            self.requests.append('groups')
+
+        return {'group': 1}
+
+
+class TestIceCache(unittest.TestCase):
+    '''Test class for IceCache.'''
+
+    def test_get_ice_entry(self):
+        '''Tests get_ice_entry method, with expiry of entries.'''
+        cache = IceCache(ttl=0.1)
+        ice_client = _IceClient()
+
+        self.assertEqual(cache.get_ice_entry(ice_client, 'SBC000001'),
+                         {'ice_id': 'SBC000001', 'version': 1})
+        self.assertEqual(cache.get_ice_entry(ice_client, 'SBC000001'),
+                         {'ice_id': 'SBC000001', 'version': 1})
+        self.assertEqual(cache.get_groups(ice_client), {'group': 1})
+        self.assertEqual(ice_client.requests, ['SBC000001', 'groups'])
+
+        # Entries are cached per ICE client:
+        self.assertEqual(cache.get_ice_entry(_IceClient(), 'SBC000001'),
+                         {'ice_id': 'SBC000001', 'version': 1})
+
+        time.sleep(0.2)
+
+        self.assertEqual(cache.get_ice_entry(ice_client, 'SBC000001'),
+                         {'ice_id': 'SBC000001', 'version': 2})
+
+    def test_get_ice_entry_concurrent(self):
+        '''Tests that concurrent requests for an entry share one fetch.'''
+        cache = IceCache()
+        ice_client = _IceClient()
+        started = Event()
+        release = Event()
+
+        def get_ice_entry(ice_id):
+            '''Gets ICE entry, blocking until released.'''
+            started.set()
+            release.wait()
+            return _IceClient.get_ice_entry(ice_client, ice_id)
+
+        ice_client.get_ice_entry = get_ice_entry
+
+        with ThreadPoolExecutor(8) as executor:
+            futures = [executor.submit(cache.get_ice_entry, ice_client,
+                                       'SBC000001')
+                       for _ in range(8)]
+            started.wait()
+            release.set()
+            entries = [future.result() for future in futures]
+
+        self.assertEqual(ice_client.requests, ['SBC000001'])
+        self.assertTrue(all(entry is entries[0] for entry in entries))
+
+    def test_get_ice_entries(self):
+        '''Tests get_ice_entries method.'''
+        cache = IceCache()
+        ice_client = _IceClient(delay=0.01)
+        ice_ids = ['SBC%06d' % (idx % 12) for idx in range(32)]
+
+        self.assertEqual([entry['ice_id']
+                          for entry in cache.get_ice_entries(ice_client,
+                                                             ice_ids)],
+                         ice_ids)
+        self.assertEqual(sorted(ice_client.requests), sorted(set(ice_ids)))
+
+    def test_invalidate(self):
+        '''Tests invalidate method.'''
+        cache = IceCache()
+        ice_client = _IceClient()
+
+        cache.get_ice_entry(ice_client, 'SBC000001')
+        cache.get_ice_entry(ice_client, 'SBC000002')
+        cache.get_groups(ice_client)
+
+        cache.invalidate(ice_client, 'SBC000001')
+        self.assertEqual(cache.get_ice_entry(ice_client, 'SBC000001'),
+                         {'ice_id': 'SBC000001', 'version': 2})
+        self.assertEqual(cache.get_ice_entry(ice_client, 'SBC000002'),
+                         {'ice_id': 'SBC000002', 'version': 1})
+
+        cache.invalidate(ice_client)
+        cache.get_ice_entry(ice_client, 'SBC000002')
+        cache.get_groups(ice_client)
+        self.assertEqual(ice_client.requests,
+                         ['SBC000001', 'SBC000002', 'groups', 'SBC000001',
+                          'SBC000002', 'groups'])
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,190 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+# pylint: disable=protected-access
+from collections import OrderedDict
+import copy
+import json
+import os
+import random
+import sys
+import timeit
+
+from synbiochem.utils import dna_utils
+
+from parts_genie import seq_metrics
+from parts_genie import vienna_utils
+from parts_genie.parts import PartsSolution
+from parts_genie.rbs_calculator import RbsCalculator
+
+
+# Relative slowdown, over baseline, reported as a regression:
+_THRESHOLD = float(os.environ.get('PARTS_GENIE_BENCHMARK_THRESHOLD', 0.2))
+
+_BASELINE_FILENAME = 'benchmark_baseline.json'
+
+_TEST_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test')
+
+_R_RNA = 'ACCTCCTTA'
+
+
+def run(queries=(('simple_query.json', 1), ('simple_query.json', 4),
+                 ('promoter_query.json', 1))):
+    '''Runs benchmarks, returning time per call, in seconds, keyed by
+    benchmark name. Annealing steps are benchmarked for each (test query
+    filename, scale) tuple of queries.'''
+    results = OrderedDict()
+    rand = random.Random(0)
+
+    # Nucleic acid calculations:
+    m_rna = _get_random_seq(rand, 70)
+    mfe = vienna_utils.run('mfe', [m_rna, _R_RNA], 37.0, 'all')
+
+    results['vienna_utils.run(mfe)'] = _time(
+        lambda: vienna_utils.run('mfe', [m_rna, _R_RNA], 37.0, 'all'))
+    results['vienna_utils.run(subopt)'] = _time(
+        lambda: vienna_utils.run('subopt', [m_rna, _R_RNA], 37.0, 'all',
+                                 energy_gap=3.0))
+    results['vienna_utils.run(energy)'] = _time(
+        lambda: vienna_utils.run('energy', [m_rna, _R_RNA], 37.0, 'all',
+                                 bp_x=mfe[1][0], bp_y=mfe[2][0]))
+
+    brackets = vienna_utils._get_brackets([len(m_rna), len(_R_RNA)],
+                                          mfe[1][0], mfe[2][0])
+
+    results['vienna_utils._get_numbered_pairs'] = _time(
+        lambda: vienna_utils._get_numbered_pairs(brackets), 10000)
+    results['vienna_utils._get_brackets'] = _time(
+        lambda: vienna_utils._get_brackets([len(m_rna), len(_R_RNA)],
+                                           mfe[1][0], mfe[2][0]), 10000)
+
+    # TIR calculations (with a new, and so empty, cache for each call):
+    for length in [300, 1200]:
+        seq = 'TTCTAGAGGGGGGATCTCCCCCCAAAAAATAAGAGGTACACATG' + \
+            _get_random_seq(rand, length)
+
+        results['RbsCalculator.calc_dgs(%i)' % length] = _time(
+            lambda seq=seq: RbsCalculator(_R_RNA, vienna_utils,
+                                          cache_dir='').calc_dgs(seq), 1)
+
+    # Sequence metrics:
+    for length in [1000, 10000]:
+        seq = _get_random_seq(rand, length)
+
+        results['seq_metrics.get_gc_counts(%i)' % length] = _time(
+            lambda seq=seq: seq_metrics.get_gc_counts(seq, 50))
+        results['seq_metrics.count_local_gc(%i)' % length] = _time(
+            lambda seq=seq: seq_metrics.count_local_gc(seq, 50, 0.15, 0.8))
+        results['seq_metrics.count_repeats(%i)' % length] = _time(
+            lambda seq=seq: seq_metrics.count_repeats(seq, 25))
+        results['seq_metrics.count_invalid(%i)' % length] = _time(
+            lambda seq=seq: seq_metrics.count_invalid(
+                seq, 5, ['BamHI', 'BsaI', 'EcoRI', 'MlyI', 'XhoI']))
+
+    # Annealing steps:
+    for filename, scale in queries:
+        solution = _get_solution(filename, scale)
+
+        def step(solution=solution):
+            '''Mutates (and so rescores) and rejects solution.'''
+            solution.mutate()
+            solution.reject()
+
+        results['PartsSolution.mutate(%s, %i)' % (filename, scale)] = \
+            _time(step, 10)
+
+    return results
+
+
+def compare(results, baseline, threshold=_THRESHOLD):
+    '''Compares results with baseline, returning regressions as
+    (name, baseline time, time) tuples.'''
+    return [(name, baseline[name], result)
+            for name, result in results.items()
+            if name in baseline and
+            result > baseline[name] * (1 + threshold)]
+
+
+def _time(func, number=100, repeat=3):
+    '''Gets minimum time per call of func.'''
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def _get_random_seq(rand, length):
+    '''Gets random sequence.'''
+    return ''.join(rand.choice('ACGT') for _ in range(length))
+
+
+def _get_solution(filename, scale):
+    '''Gets initialised PartsSolution of first design of a test query, with
+    CDS options resolved to their first option and RBS / CDS pairs repeated
+    scale times.'''
+    random.seed(0)
+
+    with open(os.path.join(_TEST_DIR, filename)) as fle:
+        query = json.load(fle)
+
+    design = query['designs'][0]
+    features = [copy.deepcopy(feature['options'][0])
+                if feature.get('options') else feature
+                for feature in design['features']]
+
+    # Repeat RBS / CDS pairs (as in an operon):
+    scaled = []
+
+    for idx, feature in enumerate(features):
+        if feature['typ'] == dna_utils.SO_CDS and idx and \
+                features[idx - 1]['typ'] == dna_utils.SO_RBS:
+            for _ in range(scale - 1):
+                scaled.extend(copy.deepcopy([feature, features[idx - 1]]))
+
+        scaled.append(feature)
+
+    design['features'] = scaled
+
+    solution = PartsSolution(design, query.get('organism', None),
+                             query['filters'])
+    solution.init()
+    return solution
+
+
+def main(argv):
+    '''main method: benchmarks, comparing results with baseline, or writing
+    baseline if absent.'''
+    baseline_filename = argv[0] if argv else _BASELINE_FILENAME
+    threshold = float(argv[1]) if len(argv) > 1 else _THRESHOLD
+
+    results = run()
+
+    if not os.path.exists(baseline_filename):
+        with open(baseline_filename, 'w') as fle:
+            json.dump(results, fle, indent=2)
+
+        print('Baseline written to %s' % baseline_filename)
+        return 0
+
+    with open(baseline_filename) as fle:
+        baseline = json.load(fle)
+
+    for name, result in results.items():
+        print('%s\t%.3e\t%s' % (name, result,
+                                '%+.1f%%' % ((result / baseline[name] - 1) *
+                                             100)
+                                if name in baseline else 'new'))
+
+    regressions = compare(results, baseline, threshold)
+
+    for name, baseline_time, result in regressions:
+        print('REGRESSION: %s %.3e > %.3e' % (name, result, baseline_time))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
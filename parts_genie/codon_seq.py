@@ -0,0 +1,98 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import random
+
+from synbiochem.utils import seq_utils
+
+
+class CodonSeq():
+    '''Protein-coding sequence held as codons, maintaining a running sum of
+    codon weights, so that mutation and CAI calculation only visit mutated
+    codons.'''
+
+    def __init__(self, cod_opt, aa_seq, seq, weights):
+        self.__cod_opt = cod_opt
+        self.__aa_seq = aa_seq
+        self.__weights = weights
+        self.__codons = [seq[idx:idx + 3] for idx in range(0, len(seq), 3)]
+
+        # As CodonOptimiser.get_cai, codons without weights are ignored:
+        codon_weights = [weights[codon] for codon in self.__codons
+                         if codon in weights]
+
+        self.__sum = sum(codon_weights)
+        self.__count = len(codon_weights)
+        self.__undo = None
+
+    def get_seq(self):
+        '''Gets sequence.'''
+        return ''.join(self.__codons)
+
+    def get_cai(self):
+        '''Gets CAI (mean codon weight).'''
+        return self.__sum / self.__count if self.__count else float('nan')
+
+    def mutate(self, mutation_rate):
+        '''Mutates codons (as CodonOptimiser.mutate), returning whether any
+        have changed.'''
+        self.__undo = [self.__sum, self.__count, []]
+
+        for idx, amino_acid in enumerate(self.__aa_seq):
+            if random.random() < mutation_rate:
+                codon = self.__cod_opt.get_random_codon(amino_acid)
+                old_codon = self.__codons[idx]
+
+                if codon != old_codon:
+                    self.__undo[2].append((idx, old_codon))
+                    self.__codons[idx] = codon
+                    self.__update_weights(old_codon, -1)
+                    self.__update_weights(codon, 1)
+
+        return bool(self.__undo[2])
+
+    def accept(self):
+        '''Accepts mutation.'''
+        self.__undo = None
+
+    def reject(self):
+        '''Rejects mutation.'''
+        if self.__undo is None:
+            return
+
+        self.__sum, self.__count, changes = self.__undo
+
+        for idx, codon in changes:
+            self.__codons[idx] = codon
+
+        self.__undo = None
+
+    def __update_weights(self, codon, sign):
+        '''Adds (or removes) codon to running sum of weights.'''
+        weight = self.__weights.get(codon, None)
+
+        if weight is not None:
+            self.__sum += sign * weight
+            self.__count += sign
+
+
+def get_codon_weights(cod_opt):
+    '''Gets codon weights (relative to the most frequent codon of each amino
+    acid), as used by CodonOptimiser.get_cai.'''
+    weights = {}
+
+    for amino_acid in set(seq_utils.AA_CODES.values()):
+        codons = cod_opt.get_all_codons(amino_acid)
+
+        if codons:
+            best_prob = cod_opt.get_codon_prob(codons[0])
+            weights.update((codon, cod_opt.get_codon_prob(codon) / best_prob)
+                           for codon in codons)
+
+    return weights
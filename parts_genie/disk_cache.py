@@ -0,0 +1,112 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import hashlib
+import json
+import os
+import sqlite3
+from threading import Lock, local
+
+
+# Process-wide caches, keyed by path:
+_CACHES = {}
+_CACHES_LOCK = Lock()
+
+
+class DiskCache():
+    '''Persistent, size-capped cache backed by SQLite, which may be shared by
+    multiple threads and processes.'''
+
+    def __init__(self, path, max_size=2 ** 20, prune_interval=1024,
+                 timeout=30.0):
+        self.__path = path
+        self.__max_size = max_size
+        self.__prune_interval = prune_interval
+        self.__timeout = timeout
+        self.__local = local()
+        self.__lock = Lock()
+        self.__puts = 0
+
+        dir_name = os.path.dirname(path)
+
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name, exist_ok=True)
+
+        with self.__get_conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache '
+                         '(key BLOB PRIMARY KEY, value TEXT NOT NULL)')
+
+    def get(self, key, default=None):
+        '''Gets value, or default if key is not cached.'''
+        try:
+            row = self.__get_conn().execute(
+                'SELECT value FROM cache WHERE key = ?',
+                (_get_hash(key),)).fetchone()
+        except sqlite3.Error:
+            # Treat an unavailable (e.g. locked) cache as a miss:
+            return default
+
+        return default if row is None else json.loads(row[0])
+
+    def put(self, key, value):
+        '''Puts value, pruning oldest values if the cache is full.'''
+        try:
+            with self.__get_conn() as conn:
+                conn.execute('INSERT OR REPLACE INTO cache VALUES (?, ?)',
+                             (_get_hash(key), json.dumps(value)))
+        except sqlite3.Error:
+            # Caching is best effort:
+            return
+
+        with self.__lock:
+            self.__puts += 1
+            prune = self.__puts % self.__prune_interval == 0
+
+        if prune:
+            self.prune()
+
+    def prune(self):
+        '''Deletes oldest values in excess of maximum size.'''
+        try:
+            with self.__get_conn() as conn:
+                size = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+                if size > self.__max_size:
+                    conn.execute('DELETE FROM cache WHERE rowid IN '
+                                 '(SELECT rowid FROM cache ORDER BY rowid '
+                                 'LIMIT ?)', (size - self.__max_size,))
+        except sqlite3.Error:
+            # Pruning will be retried on a subsequent put:
+            return
+
+    def __get_conn(self):
+        '''Gets connection for current thread.'''
+        conn = getattr(self.__local, 'conn', None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.__path, timeout=self.__timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.__local.conn = conn
+
+        return conn
+
+
+def get_disk_cache(path, max_size=2 ** 20):
+    '''Gets process-wide DiskCache for path.'''
+    with _CACHES_LOCK:
+        if path not in _CACHES:
+            _CACHES[path] = DiskCache(path, max_size)
+
+        return _CACHES[path]
+
+
+def _get_hash(key):
+    '''Gets hash of a JSON-serialisable key.'''
+    return hashlib.sha1(json.dumps(key).encode('utf-8')).digest()
@@ -9,15 +9,90 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 '''
 # pylint: disable=too-few-public-methods
 # pylint: disable=too-many-arguments
+from collections import OrderedDict
+import os
+from threading import Lock
+import time
+
+from parts_genie.disk_cache import get_disk_cache
+from parts_genie.timings import Timings
+
+
+_DEFAULT_CACHE_SIZE = 2 ** 16
+
+# Directory of optional persistent cache:
+_CACHE_DIR = os.environ.get('PARTS_GENIE_CACHE_DIR', None)
+
+# Process-wide caches, keyed by calculator and temperature:
+_SHARED_CACHES = {}
+_SHARED_CACHES_LOCK = Lock()
+
+
+class LruCache():
+    '''Thread-safe, size-bounded least-recently-used cache.'''
+
+    def __init__(self, max_size=_DEFAULT_CACHE_SIZE):
+        self.__max_size = max_size
+        self.__cache = OrderedDict()
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key, default=None):
+        '''Gets value, or default if key is not cached.'''
+        with self.__lock:
+            try:
+                value = self.__cache[key]
+            except KeyError:
+                self.__misses += 1
+                return default
+
+            self.__cache.move_to_end(key)
+            self.__hits += 1
+            return value
+
+    def put(self, key, value):
+        '''Puts value, evicting least-recently-used values if full.'''
+        with self.__lock:
+            self.__cache[key] = value
+            self.__cache.move_to_end(key)
+
+            while len(self.__cache) > self.__max_size:
+                self.__cache.popitem(last=False)
+                self.__evictions += 1
+
+    def get_stats(self):
+        '''Gets cache statistics.'''
+        with self.__lock:
+            return {'size': len(self.__cache),
+                    'max_size': self.__max_size,
+                    'hits': self.__hits,
+                    'misses': self.__misses,
+                    'evictions': self.__evictions}
 
 
 class NuclAcidCalcRunner():
     '''NuclAcidCalcRunner.'''
 
-    def __init__(self, calc, temp=37.0):
+    def __init__(self, calc, temp=37.0, cache_size=_DEFAULT_CACHE_SIZE,
+                 shared_cache=False, cache_dir=None, timings=None):
         self.__calc = calc
         self.__temp = temp
-        self.__cache = {}
+        self.__timings = timings if timings is not None \
+            else Timings(enabled=False)
+
+        if shared_cache:
+            self.__cache = _get_shared_cache(calc, temp, cache_size)
+        else:
+            self.__cache = LruCache(cache_size)
+
+        if cache_dir is None:
+            cache_dir = _CACHE_DIR
+
+        self.__disk_cache = get_disk_cache(
+            os.path.join(cache_dir, calc.__name__ + '.sqlite')) \
+            if cache_dir else None
 
     def mfe(self, sequences, dangles='some'):
         '''Runs mfe.'''
@@ -31,15 +106,110 @@ class NuclAcidCalcRunner():
         '''Runs energy.'''
         return self.__get('energy', sequences, dangles, bp_x=bp_x, bp_y=bp_y)
 
+    def run_batch(self, cmd, batch, dangles='some', energy_gap=None,
+                  pool=None):
+        '''Runs cmd over a batch of sequence lists (or, for energy, of
+        (sequences, bp_x, bp_y) tuples), calculating uncached results together
+        and returning results in batch order.'''
+        keys = [_get_key(cmd, item, dangles, energy_gap) for item in batch]
+        results = [self.__cache.get(key) for key in keys]
+        missing = OrderedDict()
+
+        for key, item, result in zip(keys, batch, results):
+            if result is None:
+                missing.setdefault(key, item)
+
+        if not missing:
+            return results
+
+        calculated = self.__calc_batch(cmd, missing, dangles, energy_gap,
+                                       pool)
+
+        for key, result in calculated.items():
+            self.__cache.put(key, result)
+
+        return [calculated[key] if result is None else result
+                for key, result in zip(keys, results)]
+
+    def get_cache_stats(self):
+        '''Gets cache statistics.'''
+        return self.__cache.get_stats()
+
     def __get(self, cmd, sequences, dangles, energy_gap=None, bp_x=None,
               bp_y=None):
         '''Gets the NuPACK result (which may be cached).'''
-        key = ';'.join([cmd, str(sequences), dangles, str(energy_gap),
-                        str(bp_x), str(bp_y)])
+        item = sequences if cmd != 'energy' else (sequences, bp_x, bp_y)
+        key = _get_key(cmd, item, dangles, energy_gap)
+        result = self.__cache.get(key)
+
+        if result is None:
+            result = self.__calc_batch(cmd, {key: item}, dangles,
+                                       energy_gap)[key]
+            self.__cache.put(key, result)
+
+        return result
+
+    def __calc_batch(self, cmd, missing, dangles, energy_gap, pool=None):
+        '''Gets results, keyed as missing, from the persistent cache, if
+        configured, or calculates them.'''
+        results = {}
+        prefix = None
+
+        if self.__disk_cache is not None:
+            prefix = (self.__calc.get_version(), self.__temp)
+
+            for key in missing:
+                result = self.__disk_cache.get(prefix + key)
+
+                if result is not None:
+                    results[key] = result
+
+        keys = [key for key in missing if key not in results]
+
+        if keys:
+            items = [missing[key] for key in keys]
+            start = time.perf_counter()
+            calculated = self.__calc.run_batch(cmd, items, self.__temp,
+                                               dangles, energy_gap, pool)
+
+            # Time calculations, binned by total length of their sequences:
+            if self.__timings.is_enabled():
+                self.__timings.add(
+                    self.__calc.__name__.split('.')[-1] + '.' + cmd,
+                    time.perf_counter() - start, len(items),
+                    [sum(len(seq) for seq in _get_sequences(cmd, item))
+                     for item in items])
+
+            for key, result in zip(keys, calculated):
+                results[key] = result
+
+                if prefix is not None:
+                    self.__disk_cache.put(prefix + key, result)
+
+        return results
+
+
+def _get_key(cmd, item, dangles, energy_gap):
+    '''Gets cache key of a batch item.'''
+    if cmd == 'energy':
+        sequences, bp_x, bp_y = item
+        return (cmd, tuple(sequences), dangles, energy_gap,
+                tuple(bp_x), tuple(bp_y))
+
+    return (cmd, tuple(item), dangles, energy_gap, None, None)
+
+
+def _get_sequences(cmd, item):
+    '''Gets sequences of a batch item.'''
+    return item[0] if cmd == 'energy' else item
+
+
+def _get_shared_cache(calc, temp, cache_size):
+    '''Gets process-wide cache for calculator and temperature.'''
+    key = (calc.__name__, temp)
 
-        if key not in self.__cache:
-            self.__cache[key] = self.__calc.run(cmd, sequences, self.__temp,
-                                                dangles, energy_gap,
-                                                bp_x, bp_y)
+    with _SHARED_CACHES_LOCK:
+        if key not in _SHARED_CACHES:
+            _SHARED_CACHES[key] = LruCache(cache_size)
 
-        return self.__cache[key]
+        return _SHARED_CACHES[key]
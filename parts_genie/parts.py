@@ -7,18 +7,34 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 
 @author:  neilswainston
 '''
+# pylint: disable=broad-except
 # pylint: disable=no-self-use
 # pylint: disable=wrong-import-order
-import collections
 import copy
-from itertools import product
 import math
+import multiprocessing
+import os
+import traceback
 
 from synbiochem.optimisation.sim_ann import SimulatedAnnealer
 from synbiochem.utils import dna_utils, seq_utils
 
 from parts_genie import rbs_calculator as rbs_calc
+from parts_genie.codon_seq import CodonSeq, get_codon_weights
+from parts_genie import seq_metrics
 from parts_genie import vienna_utils as calc
+from parts_genie.seq_scorer import SeqScorer
+from parts_genie.timings import Timings
+
+
+_ACCEPTANCE = 0.01
+_MAX_ITER = 10000
+
+# Default number of simulated annealing chains (each in its own process):
+_NUM_CHAINS = int(os.environ.get('PARTS_GENIE_NUM_CHAINS', 1))
+
+# Iterations between chains adopting the state of the best chain:
+_EXCHANGE_INTERVAL = 100
 
 
 class PartsSolution():
@@ -33,23 +49,31 @@ class PartsSolution():
         self.__filters['restr_enzs'] = self.__filters.get('restr_enzs', [])
         self.__filters['gc_min'] = float(self.__filters['gc_min'])
         self.__filters['gc_max'] = float(self.__filters['gc_max'])
+        self.__timings = Timings()
 
-        self.__calc = rbs_calc.RbsCalculator(organism['r_rna'], calc) \
+        self.__calc = rbs_calc.RbsCalculator(organism['r_rna'], calc,
+                                             shared_cache=True,
+                                             timings=self.__timings) \
             if self.__organism else None
 
         self.__cod_opt = seq_utils.CodonOptimiser(organism['taxonomy_id']) \
             if self.__organism else None
 
-        self.__dna_new = None
+        self.__codon_weights = get_codon_weights(self.__cod_opt) \
+            if self.__organism else None
+
+        self.__codon_seqs = None
+        self.__scorers = None
+        self.__undo = []
 
     def init(self):
         '''Initialisation method for longer initiation tasks.'''
         self.__init_seqs()
         self.__calc_num_fixed()
+        self.__codon_seqs = self.__get_codon_seqs()
+        self.__scorers = self.__get_scorers(_get_all_seqs(self.__dna))
         self.__update(self.__dna)
 
-        self.__dna_new = copy.deepcopy(self.__dna)
-
     def get_query(self):
         '''Return query.'''
         return {'dna': self.__dna,
@@ -108,29 +132,100 @@ class PartsSolution():
         '''Gets the (simulated annealing) energy.'''
         return float('inf') if dna is None else dna['temp_params']['energy']
 
+    def get_timings(self):
+        '''Gets timings of phases of scoring (if enabled).'''
+        return self.__timings
+
     def mutate(self):
-        '''Mutates and scores whole design.'''
-        for feature in self.__dna_new['features']:
-            if feature['typ'] == dna_utils.SO_CDS \
-                    and not feature['temp_params']['fixed']:
+        '''Mutates and scores whole design, in place, logging the state of
+        each changed feature so that the mutation can be undone.'''
+        self.__timings.iterate()
+        self.__undo = [(self.__dna, _get_state(self.__dna))]
+        changed = set()
+
+        for idx, feature in enumerate(self.__dna['features']):
+            if feature['temp_params']['fixed']:
+                continue
+
+            state = _get_state(feature)
+
+            if feature['typ'] == dna_utils.SO_CDS:
+                codon_seq = self.__codon_seqs[idx]
                 mutation_rate = 5.0 / len(feature['temp_params']['aa_seq'])
-                feature.set_seq(self.__cod_opt.mutate(
-                    feature['temp_params']['aa_seq'],
-                    feature['seq'],
-                    mutation_rate))
-            elif not feature['temp_params']['fixed']:
-                feature.set_seq(seq_utils.mutate_seq(feature['seq'],
-                                                     mutations=3))
 
-        return self.__update(self.__dna_new)
+                with self.__timings.time('mutate'):
+                    if codon_seq.mutate(mutation_rate):
+                        feature.set_seq(codon_seq.get_seq())
+            else:
+                with self.__timings.time('mutate'):
+                    feature.set_seq(seq_utils.mutate_seq(feature['seq'],
+                                                         mutations=3))
+
+            if feature['seq'] != state[0]:
+                changed.add(idx)
+                self.__undo.append((feature, state))
+
+        # A changed RBS changes the TIR of its CDS:
+        for idx in changed:
+            if self.__dna['features'][idx]['typ'] == dna_utils.SO_RBS \
+                    and idx + 1 not in changed:
+                cds = self.__dna['features'][idx + 1]
+                self.__undo.append((cds, _get_state(cds)))
+
+        return self.__update(self.__dna, changed)
+
+    def get_state(self):
+        '''Gets (a copy of) the current state.'''
+        with self.__timings.time('copy'):
+            return copy.deepcopy(self.__dna)
+
+    def set_state(self, dna):
+        '''Sets the current state, as returned by get_state, whose energy and
+        scores (retained in its temp_params) are reused rather than
+        recalculated.'''
+        self.__dna = dna
+        self.__undo = []
+        self.__codon_seqs = self.__get_codon_seqs()
+        self.__scorers = self.__get_scorers(_get_all_seqs(self.__dna))
+        return self.get_energy(self.__dna)
 
     def accept(self):
         '''Accept potential update.'''
-        self.__dna = copy.deepcopy(self.__dna_new)
+        self.__undo = []
+
+        for codon_seq in self.__codon_seqs.values():
+            codon_seq.accept()
+
+        for scorer in self.__scorers:
+            scorer.accept()
 
     def reject(self):
         '''Reject potential update.'''
-        self.__dna_new = copy.deepcopy(self.__dna)
+        for dna, state in self.__undo:
+            _set_state(dna, state)
+
+        self.__undo = []
+
+        for codon_seq in self.__codon_seqs.values():
+            codon_seq.reject()
+
+        for scorer in self.__scorers:
+            scorer.reject()
+
+    def __get_codon_seqs(self):
+        '''Gets codon sequences of unfixed CDSs, keyed by feature index.'''
+        return {idx: CodonSeq(self.__cod_opt,
+                              feature['temp_params']['aa_seq'],
+                              feature['seq'],
+                              self.__codon_weights)
+                for idx, feature in enumerate(self.__dna['features'])
+                if feature['typ'] == dna_utils.SO_CDS
+                and not feature['temp_params']['fixed']}
+
+    def __get_scorers(self, seqs):
+        '''Gets scorers of full-length sequences.'''
+        return [SeqScorer(seq, self.__filters, timings=self.__timings)
+                for seq in seqs]
 
     def __calc_num_fixed(self, flank=16):
         '''Calculate number of anomalies in fixed sequences.'''
@@ -149,9 +244,9 @@ class PartsSolution():
     def __calc_num_inv_seq_fixed(self, fixed_seqs):
         '''Calculate number of invalid sequences in fixed sequences.'''
         self.__dna['temp_params']['num_inv_seq_fixed'] = \
-            sum([len(seq_utils.find_invalid(seq,
-                                            self.__filters['max_repeats'],
-                                            self.__filters['restr_enzs']))
+            sum([seq_metrics.count_invalid(seq,
+                                           self.__filters['max_repeats'],
+                                           self.__filters['restr_enzs'])
                  for seq in fixed_seqs])
 
     def __calc_num_local_gc_fixed(self, fixed_seqs):
@@ -173,7 +268,7 @@ class PartsSolution():
                 cds = self.__dna['features'][idx + 1]
 
                 if cds['temp_params']['fixed']:
-                    _, rogue_rbs = self.__calc_tirs(feature, cds)
+                    _, rogue_rbs = self.__calc_tirs(feature, cds, idx)
                     num_rogue_rbs += len(rogue_rbs)
 
         self.__dna['temp_params']['num_rogue_rbs_fixed'] = num_rogue_rbs
@@ -232,8 +327,10 @@ class PartsSolution():
             else:
                 feature['seq'] = ''.join(feature['seq'].upper().split())
 
-    def __update(self, dna):
-        '''Calculates (simulated annealing) energies for given RBS.'''
+    def __update(self, dna, changed=None):
+        '''Calculates (simulated annealing) energies for given RBS.
+        If the indices of changed features are supplied, scores of unchanged
+        features are reused.'''
         cais = []
         tir_errs = []
         num_rogue_rbs = 0
@@ -241,15 +338,22 @@ class PartsSolution():
         for idx, feature in enumerate(dna['features']):
             if feature['typ'] == dna_utils.SO_RBS:
                 cds = dna['features'][idx + 1]
-                tir_err, rogue_rbs = self.__calc_tirs(feature, cds)
-                tir_errs.append(tir_err)
-                num_rogue_rbs += len(rogue_rbs)
+
+                if changed is None or idx in changed or idx + 1 in changed:
+                    with self.__timings.time('tir'):
+                        self.__calc_tirs(feature, cds, idx)
+
+                tir_errs.append(cds['temp_params']['tir_err'])
+                num_rogue_rbs += cds['temp_params']['num_rogue_rbs']
 
             elif feature['typ'] == dna_utils.SO_CDS \
                     and not feature['temp_params']['fixed']:
-                cai = self.__cod_opt.get_cai(feature['seq'])
-                feature['parameters']['CAI'] = cai
-                cais.append(cai)
+                if changed is None or idx in changed:
+                    with self.__timings.time('cai'):
+                        feature['parameters']['CAI'] = \
+                            self.__codon_seqs[idx].get_cai()
+
+                cais.append(feature['parameters']['CAI'])
 
         dna['temp_params']['mean_cai'] = _mean(cais) if cais else 0
         dna['temp_params']['mean_tir_errs'] = _mean(tir_errs) \
@@ -257,26 +361,33 @@ class PartsSolution():
         dna['temp_params']['num_rogue_rbs'] = num_rogue_rbs - \
             dna['temp_params']['num_rogue_rbs_fixed']
 
-        # Get number of invalid seqs:
+        # Score full-length sequences, rescoring only mutated windows:
         all_seqs = _get_all_seqs(dna)
 
+        if len(all_seqs) != len(self.__scorers):
+            self.__scorers = self.__get_scorers(all_seqs)
+
+        scores = [scorer.score(seq)
+                  for scorer, seq in zip(self.__scorers, all_seqs)]
+
+        # Get number of invalid seqs:
         dna['temp_params']['num_inv_seq'] = \
-            sum([len(seq_utils.find_invalid(seq,
-                                            self.__filters['max_repeats'],
-                                            self.__filters['restr_enzs']))
-                 for seq in all_seqs]) - \
+            sum([score['num_inv_seq'] for score in scores]) - \
             dna['temp_params']['num_inv_seq_fixed']
 
         # Calculate GC content:
         dna['parameters']['Global GC'] = \
-            _mean([_get_gc(seq) for seq in all_seqs])
+            _mean([score['gc'] for score in scores])
 
-        dna['temp_params']['Local GC'] = self.__get_local_gc(all_seqs) - \
+        dna['temp_params']['Local GC'] = \
+            sum([score['local_gc'] for score in scores]) - \
             self.__dna['temp_params']['num_local_gc_fixed']
 
-        dna['temp_params']['GC variance'] = _get_gc_var(all_seqs)
+        dna['temp_params']['GC variance'] = \
+            sum([score['gc_var'] for score in scores])
 
-        dna['temp_params']['num_repeats'] = _get_repeats(all_seqs) - \
+        dna['temp_params']['num_repeats'] = \
+            sum([score['repeats'] for score in scores]) - \
             self.__dna['temp_params']['num_repeats_fixed']
 
         dna['temp_params']['energy'] = dna['temp_params']['mean_tir_errs'] + \
@@ -291,10 +402,12 @@ class PartsSolution():
 
         return self.get_energy(dna)
 
-    def __calc_tirs(self, rbs, cds):
+    def __calc_tirs(self, rbs, cds, idx):
         '''Performs TIR calculations.'''
+        # Key by RBS index, so that dGs of unchanged start codons are reused:
         tir_vals = self.__calc.calc_dgs(rbs['seq'] + cds['seq'],
-                                        len(rbs['seq']))
+                                        len(rbs['seq']),
+                                        key=idx)
 
         cds['temp_params']['tir_vals'] = tir_vals
 
@@ -321,25 +434,20 @@ class PartsSolution():
                      if pos != rbs['end'] and terms[1] >
                      rbs['parameters']['TIR target'] * cutoff]
 
+        # Retain scores, for reuse while this RBS / CDS pair is unchanged:
+        cds['temp_params']['tir_err'] = tir_err
+        cds['temp_params']['num_rogue_rbs'] = len(rogue_rbs)
+
         return tir_err, rogue_rbs
 
     def __get_local_gc(self, seqs):
         '''Get local GC score.'''
-        local_gc_count = 0
-
         window_size = self.__filters['local_gc_window']
 
-        for seq in seqs:
-            local_gcs = [_get_gc(seq[idx:idx + window_size])
-                         for idx in range(len(seq) - window_size + 1)]
-
-            for local_gc in local_gcs:
-                if _get_delta_range(self.__filters['local_gc_min'],
-                                    self.__filters['local_gc_max'],
-                                    local_gc):
-                    local_gc_count += 1
-
-        return local_gc_count
+        return sum(seq_metrics.count_local_gc(seq, window_size,
+                                              self.__filters['local_gc_min'],
+                                              self.__filters['local_gc_max'])
+                   for seq in seqs)
 
     def __repr__(self):
         # return '%r' % (self.__dict__)
@@ -365,14 +473,351 @@ class PartsSolution():
 
 
 class PartsThread(SimulatedAnnealer):
-    '''Wraps a PartsGenie job into a thread.'''
+    '''Wraps a PartsGenie job into a thread.
+    With multiple chains, each chain anneals in its own process and chains
+    periodically adopt the state of the best chain.'''
+
+    def __init__(self, query, idx, verbose=True, num_chains=_NUM_CHAINS):
+        self.__query = query
+        self.__idx = idx
+        self.__verbose = verbose
+        self.__num_chains = num_chains
+        self.__solution = _get_solution(query, idx)
+
+        # Set to stop all chains, when any chain ends or job is cancelled:
+        self.__stop = multiprocessing.get_context('spawn').Event() \
+            if num_chains > 1 else None
+
+        SimulatedAnnealer.__init__(self, self.__solution,
+                                   acceptance=_ACCEPTANCE,
+                                   max_iter=_MAX_ITER,
+                                   verbose=verbose)
+
+    def run(self):
+        '''Optimises solution.'''
+        if self.__num_chains > 1:
+            self.__run_chains()
+        else:
+            SimulatedAnnealer.run(self)
+
+    def cancel(self):
+        '''Cancels the current job, stopping any chains.'''
+        SimulatedAnnealer.cancel(self)
+
+        if self.__stop is not None:
+            self.__stop.set()
+
+    def __run_chains(self):
+        '''Optimises solution with multiple chains.'''
+        context = multiprocessing.get_context('spawn')
+        conns = []
+        processes = []
+
+        try:
+            self.__fire_event('running', 0, 0, 'Job initialising...')
+
+            for _ in range(self.__num_chains):
+                conn, child_conn = context.Pipe()
+                process = context.Process(target=_run_chain,
+                                          args=(self.__query, self.__idx,
+                                                child_conn, self.__stop))
+                process.daemon = True
+                process.start()
+                conns.append(conn)
+                processes.append(process)
+
+            for conn in conns:
+                _recv(conn)
+
+            self.__fire_event('running', 0, 0, 'Job initialised')
+
+            # Each chain reports its status, (exchange or done, energy,
+            # iteration), every _EXCHANGE_INTERVAL iterations or when done:
+            while True:
+                statuses = [_recv(conn) for conn in conns]
+                best = _get_best(statuses)
+                _, energy, iteration = statuses[best]
+
+                if any(status[0] == 'done' for status in statuses):
+                    break
+
+                # Chains adopt state (and so scores) of best chain:
+                conns[best].send(('get_state', ()))
+                state = _recv(conns[best])
+
+                for conn, status in zip(conns, statuses):
+                    conn.send(('set_state', (state,)) if status[1] > energy
+                              else ('continue', ()))
+
+                self.__solution.set_state(state)
+
+                if self.__verbose:
+                    energies = [status[1] for status in statuses]
+                    print('\t'.join(['C', str(iteration), str(energy),
+                                     str(energies)]))
+
+                self.__fire_event('running',
+                                  float(iteration) / _MAX_ITER * 100,
+                                  iteration, 'Running...')
+
+            # Stop chains awaiting exchange:
+            self.__stop.set()
+
+            for idx, conn in enumerate(conns):
+                if statuses[idx][0] == 'exchange':
+                    conn.send(('halt', ()))
+                    statuses[idx] = _recv(conn)
+
+            best = _get_best(statuses)
+            _, energy, iteration = statuses[best]
+            conns[best].send(('get_state', ()))
+            self.__solution.set_state(_recv(conns[best]))
+
+            # Gather timings of chains:
+            timings = self.__solution.get_timings()
+
+            if timings.is_enabled():
+                for conn in conns:
+                    conn.send(('get_timings', ()))
+                    timings.merge(_recv(conn))
+
+            if iteration == _MAX_ITER:
+                self.__fire_event('error', 100, iteration,
+                                  'Unable to optimise in ' + str(_MAX_ITER) +
+                                  ' iterations')
+            elif self._cancelled:
+                self.__fire_event('cancelled', 100, iteration,
+                                  'Job cancelled')
+            else:
+                self.__fire_event('finished', 100, iteration,
+                                  'Job completed')
+        except Exception:
+            self.__fire_event('error', 100, 0, traceback.format_exc())
+        finally:
+            self.__stop.set()
+
+            for conn in conns:
+                try:
+                    conn.send(('stop', ()))
+                except OSError:
+                    continue
+
+            for process in processes:
+                process.join()
+
+    def _fire_event(self, event):
+        '''Fires an event, reporting timings (if enabled) once the job has
+        ended.'''
+        if event['update']['status'] != 'running':
+            # Snapshot design, which the solution mutates in place, so that
+            # it matches the reported values however late it is serialised:
+            event['query'] = copy.deepcopy(event['query'])
+
+            timings = self.__solution.get_timings()
+
+            if timings.is_enabled():
+                event['update']['timings'] = timings.get()
+
+        SimulatedAnnealer._fire_event(self, event)
+
+    def __fire_event(self, status, progress, iteration, message):
+        '''Fires an event.'''
+        event = {'update': {'status': status,
+                            'message': message,
+                            'progress': progress,
+                            'iteration': iteration,
+                            'max_iter': _MAX_ITER,
+                            'values': self.__solution.get_values()},
+                 'query': self.__solution.get_query()
+                 }
+
+        if status == 'finished':
+            event['result'] = self.__solution.get_result()
+
+        self._fire_event(event)
+
+
+class _Chain(SimulatedAnnealer):
+    '''Simulated annealing chain, run in a worker process, which is stopped
+    (at its next iteration) when any chain ends or the job is cancelled.'''
+
+    def __init__(self, solution, stop):
+        self.__stop = stop
+        self.__error = None
+
+        SimulatedAnnealer.__init__(self, solution,
+                                   acceptance=_ACCEPTANCE,
+                                   max_iter=_MAX_ITER)
+
+    @property
+    def _cancelled(self):
+        '''Gets whether chain is stopped.'''
+        return self.__stop.is_set()
+
+    @_cancelled.setter
+    def _cancelled(self, cancelled):
+        '''Stops chain (and so all chains) if cancelled.'''
+        if cancelled:
+            self.__stop.set()
+
+    def get_error(self):
+        '''Gets error message of chain, if any.'''
+        return self.__error
+
+    def _fire_event(self, event):
+        '''Retains error messages, other than that of reaching the maximum
+        number of iterations, which is handled by PartsThread.'''
+        update = event['update']
+
+        if update['status'] == 'error' and update['iteration'] < _MAX_ITER:
+            self.__error = update['message']
+
+
+class _ChainSolution():
+    '''Solution of a chain, which reports its status to PartsThread, and may
+    adopt the state of the best chain, every _EXCHANGE_INTERVAL
+    iterations.'''
+
+    def __init__(self, solution, conn):
+        self.__solution = solution
+        self.__conn = conn
+        self.__iteration = 0
+        self.__energy = float('inf')
+        self.__energy_new = None
+        self.__exiting = False
+
+    def init(self):
+        '''Initialises solution.'''
+        self.__solution.init()
+        self.__conn.send((True, None))
+
+    def get_query(self):
+        '''Return query.'''
+        return self.__solution.get_query()
+
+    def get_values(self):
+        '''Return update of in-progress solution.'''
+        return self.__solution.get_values()
+
+    def get_result(self):
+        '''Return None, as the result (which expands, and so changes, the
+        solution) is got by PartsThread from the state of the best chain.'''
+        return None
+
+    def get_energy(self):
+        '''Gets the (simulated annealing) energy of the accepted state.'''
+        return self.__energy
+
+    def get_status(self):
+        '''Gets energy of accepted state and number of iterations.'''
+        return self.__energy, self.__iteration
+
+    def get_state(self):
+        '''Gets (a copy of) the accepted state.'''
+        return self.__solution.get_state()
+
+    def is_exiting(self):
+        '''Gets whether chain was told to exit while exchanging.'''
+        return self.__exiting
+
+    def get_timings(self):
+        '''Gets timings of solution.'''
+        return self.__solution.get_timings().get()
+
+    def mutate(self):
+        '''Mutates solution or, when exchanging, adopts the state of the best
+        chain.'''
+        self.__iteration += 1
+
+        if not self.__iteration % _EXCHANGE_INTERVAL:
+            self.__energy_new = self.__exchange()
+
+            if self.__energy_new is not None:
+                return self.__energy_new
+
+        self.__energy_new = self.__solution.mutate()
+        return self.__energy_new
+
+    def accept(self):
+        '''Accept potential update.'''
+        self.__solution.accept()
+        self.__energy = self.__energy_new
+
+    def reject(self):
+        '''Reject potential update.'''
+        self.__solution.reject()
+
+    def __exchange(self):
+        '''Reports status, returning the energy of the best chain's state if
+        adopted, the accepted energy (so that the step is rejected) if halted
+        or told to exit, or None to continue.'''
+        self.__conn.send((True, ('exchange',) + self.get_status()))
+
+        while True:
+            cmd, args = self.__conn.recv()
+
+            if cmd == 'get_state':
+                self.__conn.send((True, self.get_state()))
+            elif cmd == 'set_state':
+                return self.__solution.set_state(*args)
+            elif cmd in ('halt', 'stop'):
+                self.__exiting = cmd == 'stop'
+                return self.__energy
+            else:
+                return None
+
+
+def _get_solution(query, idx):
+    '''Gets PartsSolution of design.'''
+    return PartsSolution(query['designs'][idx],
+                         query.get('organism', None),
+                         query['filters'])
+
+
+def _run_chain(query, idx, conn, stop):
+    '''Runs simulated annealing chain in a worker process, then responds to
+    commands until stopped.'''
+    try:
+        solution = _ChainSolution(_get_solution(query, idx), conn)
+        chain = _Chain(solution, stop)
+        chain.run()
+
+        # Any chain ending ends all chains:
+        stop.set()
 
-    def __init__(self, query, idx, verbose=True):
-        solution = PartsSolution(query['designs'][idx],
-                                 query.get('organism', None),
-                                 query['filters'])
+        if solution.is_exiting():
+            return
 
-        SimulatedAnnealer.__init__(self, solution, verbose=verbose)
+        if chain.get_error() is not None:
+            conn.send((False, chain.get_error()))
+            return
+
+        conn.send((True, ('done',) + solution.get_status()))
+
+        while True:
+            cmd, args = conn.recv()
+
+            if cmd == 'stop':
+                break
+
+            conn.send((True, getattr(solution, cmd)(*args)))
+    except Exception:
+        conn.send((False, traceback.format_exc()))
+
+
+def _get_best(statuses):
+    '''Gets index of chain status of lowest energy.'''
+    return min(range(len(statuses)), key=lambda idx: statuses[idx][1])
+
+
+def _recv(conn):
+    '''Receives response from chain, raising any error in the chain.'''
+    success, value = conn.recv()
+
+    if not success:
+        raise ValueError(value)
+
+    return value
 
 
 def _mean(lst):
@@ -380,6 +825,18 @@ def _mean(lst):
     return float(sum(lst)) / len(lst) if lst else 0.0
 
 
+def _get_state(dna):
+    '''Gets the mutable state of a DNA object, copying only its (shallow)
+    parameter dicts.'''
+    return dna['seq'], dna['end'], dict(dna['parameters']), \
+        dict(dna['temp_params'])
+
+
+def _set_state(dna, state):
+    '''Sets the mutable state of a DNA object.'''
+    dna['seq'], dna['end'], dna['parameters'], dna['temp_params'] = state
+
+
 def _get_delta_range(min_val, max_val, val):
     '''Gets delta of val from min_val, max_val range.'''
     if val < min_val:
@@ -390,48 +847,12 @@ def _get_delta_range(min_val, max_val, val):
     return 0
 
 
-def _get_gc(seq):
-    '''Get GC content.'''
-    return (seq.count('G') + seq.count('C')) / float(len(seq))
-
-
-def _get_gc_var(seqs, window_size=50, tol=0.52):
-    '''Get local GC variance.'''
-    local_gc_var = 0
-
-    for seq in seqs:
-        local_gcs = sorted([_get_gc(seq[idx:idx + window_size])
-                            for idx in range(len(seq) - window_size + 1)])
-
-        if local_gcs[-1] - local_gcs[0] > tol:
-            local_gc_var += 1
-
-    return local_gc_var
-
-
 def _get_repeats(seqs, window_size=25):
-    '''Get local GC score.'''
-    repeats = 0
-
-    for seq in seqs:
-        windows = [seq[idx:idx + window_size]
-                   for idx in range(len(seq) - window_size + 1)]
-        counter = collections.Counter(windows)
-        repeats += sum(i for i in counter.values() if i > 1)
-
-    return repeats
+    '''Get number of repeated windows.'''
+    return sum(seq_metrics.count_repeats(seq, window_size) for seq in seqs)
 
 
 def _get_all_seqs(dna):
-    '''Return all sequences.'''
-    all_seqs = ['']
-
-    for feature in dna['features']:
-        if feature['typ'] == dna_utils.SO_CDS:
-            options = [feature['seq']]
-            all_seqs = [''.join(term) for term in product(all_seqs, options)]
-        else:
-            for idx, seq in enumerate(all_seqs):
-                all_seqs[idx] = seq + feature['seq']
-
-    return all_seqs
+    '''Return all sequences (a single sequence, as CDS options are resolved
+    before optimisation), joining the features once.'''
+    return [''.join(feature['seq'] for feature in dna['features'])]
@@ -12,9 +12,15 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 # pylint: disable=too-many-locals
 # pylint: disable=too-many-statements
 # pylint: disable=wrong-import-order
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import importlib
 import math
+import multiprocessing
+import os
 import random
 import re
+from threading import Lock
 
 from Bio.Seq import Seq
 from synbiochem.utils import seq_utils
@@ -32,19 +38,48 @@ _START_CODON_ENERGIES = {'ATG': -1.194, 'GTG': -0.0748, 'TTG': -0.0435,
 _MEAN_SYART_CODON_ENERGY = \
     sum(_START_CODON_ENERGIES.values()) / len(_START_CODON_ENERGIES)
 
+# Energy gap of suboptimal m_rna:r_rna binding sites:
+_ENERGY_CUTOFF = 3.0
+
+# Default number of worker processes for calc_dgs (0 or 1 for serial):
+_NUM_WORKERS = int(os.environ.get('PARTS_GENIE_NUM_WORKERS', 0))
+
+# Maximum number of sequences for which start codon dGs are retained:
+_MAX_DGS = 256
+
+# Process pools, keyed by number of workers:
+_POOLS = {}
+_POOLS_LOCK = Lock()
+
+# Worker process RbsCalculators, keyed by r_rna, calc name and temperature:
+_WORKER_CALCS = {}
+
 
 class RbsCalculator():
     '''Class for calculating RBS.'''
 
-    def __init__(self, r_rna, calc, temp=37.0):
+    def __init__(self, r_rna, calc, temp=37.0, shared_cache=False,
+                 cache_dir=None, pool=None, num_workers=_NUM_WORKERS,
+                 timings=None):
         self.__r_rna = r_rna.upper()
-        self.__runner = NuclAcidCalcRunner(calc, temp)
+        self.__calc_name = calc.__name__
+        self.__temp = temp
+        self.__runner = NuclAcidCalcRunner(calc, temp,
+                                           shared_cache=shared_cache,
+                                           cache_dir=cache_dir,
+                                           timings=timings)
+        self.__pool = pool
+        self.__num_workers = num_workers
+        self.__dgs = OrderedDict()
         self.__optimal_spacing = 5
         self.__cutoff = 35
 
-    def calc_dgs(self, m_rna, cds_start=float('NaN'), limit=float('inf')):
+    def calc_dgs(self, m_rna, cds_start=float('NaN'), limit=float('inf'),
+                 key=None):
         ''''Calculates each dg term in the free energy model and sums them to
-        create dg_total.'''
+        create dg_total.
+        dGs of the previous m_rna with the same key are reused for start
+        codons whose surrounding window is unchanged.'''
         m_rna = m_rna.upper()
 
         start_positions = []
@@ -59,24 +94,61 @@ class RbsCalculator():
         if math.isfinite(cds_start):
             all_start_pos.add(cds_start)
 
+        # dG depends only upon the window surrounding the start codon:
+        prev_dgs = self.__dgs.pop(key, {})
+        windows = {start_pos: self.__get_window(m_rna, start_pos)
+                   for start_pos in all_start_pos}
+        changed = {start_pos for start_pos in all_start_pos
+                   if prev_dgs.get(start_pos, (None,))[0] !=
+                   windows[start_pos]}
+
+        calc_d_gs = None
+
+        if self.__num_workers > 1:
+            calc_d_gs = dict(self.__calc_dgs_parallel(m_rna, changed))
+        elif math.isinf(limit):
+            self.__prefetch(m_rna, changed)
+
+        dgs = {}
+
         for start_pos in all_start_pos:
-            try:
-                d_g = self.__calc_dg(m_rna, start_pos)
-
-                if not math.isinf(d_g):
-                    start_positions.append(start_pos)
-                    dgs_tirs.append((d_g, get_tir(d_g)))
-                    count += 1
-            except ValueError:
-                # Occurs when start codon appears at start of sequence, and is
-                # therefore leaderless. Take no action, as safe to ignore.
-                continue
+            if start_pos not in changed:
+                d_g = prev_dgs[start_pos][1]
+            elif calc_d_gs is not None:
+                d_g = calc_d_gs[start_pos]
+            else:
+                d_g = self.calc_dg(m_rna, start_pos)
+
+            dgs[start_pos] = (windows[start_pos], d_g)
+
+            if d_g is not None and not math.isinf(d_g):
+                start_positions.append(start_pos)
+                dgs_tirs.append((d_g, get_tir(d_g)))
+                count += 1
 
             if count == limit:
                 break
 
+        self.__dgs[key] = dgs
+
+        if len(self.__dgs) > _MAX_DGS:
+            self.__dgs.popitem(last=False)
+
         return dict(zip(start_positions, dgs_tirs))
 
+    def calc_dg(self, m_rna, start_pos):
+        '''Calculates dG of start position, or None if it is ignored.'''
+        try:
+            return self.__calc_dg(m_rna, start_pos)
+        except ValueError:
+            # Occurs when start codon appears at start of sequence, and is
+            # therefore leaderless. Take no action, as safe to ignore.
+            return None
+
+    def get_cache_stats(self):
+        '''Gets statistics of cache of nucleic acid calculations.'''
+        return self.__runner.get_cache_stats()
+
     def calc_kinetic_score(self, m_rna, start_pos, dangles='none'):
         '''Gets kinetic score.'''
         sub_m_rna = \
@@ -148,15 +220,59 @@ class RbsCalculator():
                                      prob_shine_delgano, core_length,
                                      max_nonoptimal_spacing)
 
+    def __get_window(self, m_rna, start_pos):
+        '''Gets window of m_rna upon which dG of start position depends.'''
+        return m_rna[max(0, start_pos - self.__cutoff):
+                     min(len(m_rna), start_pos + self.__cutoff)]
+
+    def __calc_dgs_parallel(self, m_rna, all_start_pos):
+        '''Calculates dGs of start positions across worker processes,
+        returning them in the same order as the serial calculation.'''
+        sorted_start_pos = sorted(all_start_pos)
+        num_chunks = min(len(sorted_start_pos), self.__num_workers * 4)
+        chunks = [sorted_start_pos[idx::num_chunks]
+                  for idx in range(num_chunks)]
+
+        results = {}
+
+        for chunk, d_gs in zip(chunks,
+                               _get_pool(self.__num_workers).map(
+                                   _calc_dgs_worker,
+                                   [(self.__r_rna, self.__calc_name,
+                                     self.__temp, m_rna, chunk)
+                                    for chunk in chunks])):
+            results.update(zip(chunk, d_gs))
+
+        return [(start_pos, results[start_pos])
+                for start_pos in all_start_pos]
+
+    def __prefetch(self, m_rna, start_positions):
+        '''Calculates, as batches, the m_rna folding and m_rna:r_rna binding
+        site energies of all start positions, which are then cached.'''
+        batches = {}
+
+        for start_pos in start_positions:
+            begin = max(0, start_pos - self.__cutoff)
+            dangles = _get_dangles(start_pos)
+            batch = batches.setdefault(dangles, {'mfe': [], 'subopt': []})
+            batch['mfe'].append(
+                [m_rna[begin:min(len(m_rna), start_pos + self.__cutoff)]])
+
+            if start_pos > begin:
+                batch['subopt'].append([m_rna[begin:start_pos],
+                                        self.__r_rna])
+
+        for dangles, batch in batches.items():
+            self.__runner.run_batch('mfe', batch['mfe'], dangles=dangles,
+                                    pool=self.__pool)
+            self.__runner.run_batch('subopt', batch['subopt'],
+                                    dangles=dangles,
+                                    energy_gap=_ENERGY_CUTOFF,
+                                    pool=self.__pool)
+
     def __calc_dg(self, m_rna, start_pos):
         '''Calculates dG.'''
-        # Set dangles based on length between 5' end of m_rna and start codon:
-        max_rbs_len = 35
-
-        if start_pos > max_rbs_len:
-            dangles = 'none'
-        else:
-            dangles = 'all'
+        dangles = _get_dangles(start_pos)
 
         # Start codon energy:
 
@@ -195,7 +311,7 @@ class RbsCalculator():
         '''Calculates the dg_m_rna_r_rna from the m_rna and r_rna sequence.
         Considers all feasible 16S r_rna binding sites and includes the effects
         of non-optimal spacing.'''
-        energy_cutoff = 3.0
+        energy_cutoff = _ENERGY_CUTOFF
 
         # Footprint of the 30S complex that prevents formation of secondary
         # structures downstream of the start codon. Here, we assume that the
@@ -524,6 +640,39 @@ def get_tir(d_g):
     return _K * math.exp(-d_g / _RT_EFF)
 
 
+def _get_pool(num_workers):
+    '''Gets process-wide pool of worker processes.'''
+    with _POOLS_LOCK:
+        if num_workers not in _POOLS:
+            # Spawn, rather than fork, as the server process is threaded:
+            _POOLS[num_workers] = ProcessPoolExecutor(
+                num_workers,
+                mp_context=multiprocessing.get_context('spawn'))
+
+        return _POOLS[num_workers]
+
+
+def _calc_dgs_worker(args):
+    '''Calculates dGs of start positions in a worker process.'''
+    r_rna, calc_name, temp, m_rna, start_positions = args
+    key = (r_rna, calc_name, temp)
+
+    if key not in _WORKER_CALCS:
+        _WORKER_CALCS[key] = RbsCalculator(r_rna,
+                                           importlib.import_module(calc_name),
+                                           temp, num_workers=0)
+
+    calc = _WORKER_CALCS[key]
+    return [calc.calc_dg(m_rna, start_pos) for start_pos in start_positions]
+
+
+def _get_dangles(start_pos):
+    '''Gets dangles, based on length between 5' end of m_rna and start
+    codon.'''
+    max_rbs_len = 35
+    return 'none' if start_pos > max_rbs_len else 'all'
+
+
 def _calc_longest_loop_bulge(m_rna, bp_x, bp_y, rbs=None):
     ''''Calculate the longest helical loop and bulge structure
     (longest contiguous list of un-base paired nucleotides starting and
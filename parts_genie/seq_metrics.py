@@ -0,0 +1,154 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+# pylint: disable=wrong-import-order
+import collections
+import functools
+import re
+
+from Bio.Restriction import AllEnzymes
+from synbiochem.utils import seq_utils
+
+import numpy as np
+
+
+# 2-bit codes of nucleotides (255 for any other character):
+_CODES = np.full(256, 255, dtype=np.uint8)
+_CODES[[ord(nucl) for nucl in 'ACGT']] = range(4)
+
+# Maximum window length that can be packed into a 64-bit key:
+_MAX_PACKED_WINDOW = 32
+
+
+def encode(seq):
+    '''Encodes a sequence as a uint8 array.'''
+    return np.frombuffer(seq.encode('ascii'), dtype=np.uint8)
+
+
+def count_gc(seq):
+    '''Counts GC.'''
+    return seq.count('G') + seq.count('C')
+
+
+def get_gc_counts(seq, window):
+    '''Gets GC counts of every window, from prefix sums.'''
+    if len(seq) < window:
+        return np.zeros(0, dtype=np.int64)
+
+    arr = encode(seq)
+    prefix = np.zeros(len(arr) + 1, dtype=np.int64)
+    np.cumsum((arr == ord('G')) | (arr == ord('C')), out=prefix[1:])
+    return prefix[window:] - prefix[:-window]
+
+
+def count_local_gc(seq, window, gc_min, gc_max):
+    '''Counts windows with GC content outside of the range gc_min - gc_max.'''
+    local_gcs = get_gc_counts(seq, window) / float(window)
+    return int(np.count_nonzero((local_gcs < gc_min) |
+                                (local_gcs > gc_max)))
+
+
+def get_kmers(seq, window):
+    '''Gets keys of every window: packed integers for windows of ACGT only,
+    or the window itself otherwise.'''
+    packed, other = _get_kmers(seq, window)
+    return packed.tolist() + other
+
+
+def count_repeats(seq, window):
+    '''Counts windows that occur more than once.'''
+    packed, other = _get_kmers(seq, window)
+    _, counts = np.unique(packed, return_counts=True)
+
+    return int(counts[counts > 1].sum()) + \
+        sum(count for count in collections.Counter(other).values()
+            if count > 1)
+
+
+def count_invalid(seq, max_repeats, restr_enzs):
+    '''Counts invalid sequences (nucleotide repeats and restriction sites), as
+    seq_utils.find_invalid, in a single pass of a combined pattern.'''
+    combined, repeats, enzymes = \
+        _get_invalid_patterns(max_repeats, tuple(str(enz)
+                                                 for enz in restr_enzs))
+
+    if combined is None:
+        return 0
+
+    seq = seq.upper()
+    count = 0
+    matched = set()
+
+    for match in combined.finditer(seq):
+        pos = match.start()
+
+        if repeats is not None and repeats.match(seq, pos):
+            count += 1
+
+        for name, compsite in enzymes:
+            if name not in matched and compsite.match(seq, pos):
+                matched.add(name)
+
+    # Count cut sites of matching enzymes (which may lie outside seq):
+    return count + sum(len(seq_utils.find_invalid(seq, restr_enzyms=[name]))
+                       for name in matched)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_invalid_patterns(max_repeats, restr_enzs):
+    '''Gets combined pattern of invalid sequences, with repeat pattern and
+    (enzyme name, site pattern) tuples, with which to identify matches.'''
+    patterns = []
+    repeats = None
+
+    if max_repeats != float('inf'):
+        repeats = re.compile(
+            '(?=(' + '|'.join([nucl * (max_repeats + 1)
+                               for nucl in seq_utils.NUCLEOTIDES]) + '))')
+        patterns.append(repeats.pattern)
+
+    enzymes = [(name, AllEnzymes.get(name).compsite) for name in restr_enzs]
+
+    # Remove named groups, which may not be repeated in combined pattern:
+    patterns.extend([re.sub(r'\(\?P<[^>]+>', '(', compsite.pattern)
+                     for _, compsite in enzymes])
+
+    combined = re.compile('|'.join(patterns)) if patterns else None
+
+    return combined, repeats, enzymes
+
+
+def _get_kmers(seq, window):
+    '''Gets rolling 2-bit packed keys of windows of ACGT only, and remaining
+    windows as strings.'''
+    num_windows = len(seq) - window + 1
+
+    if num_windows < 1:
+        return np.zeros(0, dtype=np.uint64), []
+
+    if window > _MAX_PACKED_WINDOW:
+        return np.zeros(0, dtype=np.uint64), \
+            [seq[idx:idx + window] for idx in range(num_windows)]
+
+    codes = _CODES[encode(seq)]
+
+    # Flag windows containing non-ACGT characters:
+    prefix = np.zeros(len(codes) + 1, dtype=np.int64)
+    np.cumsum(codes == 255, out=prefix[1:])
+    valid = (prefix[window:] - prefix[:-window]) == 0
+
+    packed = np.zeros(num_windows, dtype=np.uint64)
+    codes = codes.astype(np.uint64)
+
+    for idx in range(window):
+        packed <<= np.uint64(2)
+        packed |= codes[idx:idx + num_windows]
+
+    return packed[valid], [seq[idx:idx + window]
+                           for idx in np.flatnonzero(~valid)]
@@ -0,0 +1,263 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-instance-attributes
+# pylint: disable=too-many-locals
+# pylint: disable=wrong-import-order
+import collections
+
+from Bio.Restriction import AllEnzymes
+
+from parts_genie import seq_metrics
+from parts_genie.timings import Timings
+import numpy as np
+
+
+class SeqScorer():
+    '''Scores a full-length sequence, rescoring only those windows affected
+    by a mutation.'''
+
+    def __init__(self, seq, filters, gc_var_window=50, gc_var_tol=0.52,
+                 repeat_window=25, timings=None):
+        self.__filters = filters
+        self.__timings = timings if timings is not None \
+            else Timings(enabled=False)
+        self.__gc_var_window = gc_var_window
+        self.__gc_var_tol = gc_var_tol
+        self.__repeat_window = repeat_window
+        self.__inv_flank = _get_inv_flank(filters['max_repeats'],
+                                          filters['restr_enzs'])
+        self.__flank = max(self.__inv_flank,
+                           filters['local_gc_window'],
+                           gc_var_window,
+                           repeat_window)
+
+        self.__state = self.__score_full(seq)
+        self.__pending = None
+
+    def get_scores(self):
+        '''Gets scores of accepted sequence.'''
+        return self.__state['scores']
+
+    def score(self, seq):
+        '''Scores a candidate sequence.'''
+        if len(seq) == len(self.__state['seq']):
+            self.__pending = self.__score_delta(seq)
+        else:
+            self.__pending = self.__score_full(seq)
+
+        return self.__pending['scores']
+
+    def accept(self):
+        '''Accepts candidate sequence.'''
+        if self.__pending is None:
+            return
+
+        if self.__pending['full']:
+            self.__state = self.__pending
+        else:
+            self.__state['seq'] = self.__pending['seq']
+            self.__state['scores'] = self.__pending['scores']
+            self.__state['gc_count'] = self.__pending['gc_count']
+
+            self.__state['gc_hist'] += self.__pending['gc_hist']
+
+            kmers = self.__state['kmers']
+            kmers.update(self.__pending['kmers'])
+
+            for kmer in self.__pending['kmers']:
+                if kmers[kmer] <= 0:
+                    del kmers[kmer]
+
+        self.__pending = None
+
+    def reject(self):
+        '''Rejects candidate sequence.'''
+        self.__pending = None
+
+    def __score_full(self, seq):
+        '''Scores a sequence from scratch.'''
+        timings = self.__timings
+        scores = {}
+
+        with timings.time('inv_seq'):
+            scores['num_inv_seq'] = self.__count_inv(seq)
+
+        with timings.time('gc'):
+            gc_count = seq_metrics.count_gc(seq)
+            scores['gc'] = _get_gc(gc_count, seq)
+
+        with timings.time('local_gc'):
+            scores['local_gc'] = self.__count_local_gc(seq)
+
+        with timings.time('gc_var'):
+            gc_hist = self.__get_gc_hist(seq)
+            scores['gc_var'] = self.__get_gc_var(gc_hist)
+
+        with timings.time('repeats'):
+            kmers = collections.Counter(seq_metrics.get_kmers(
+                seq, self.__repeat_window))
+            scores['repeats'] = sum(_get_repeats(count)
+                                    for count in kmers.values())
+
+        return {'seq': seq,
+                'scores': scores,
+                'gc_count': gc_count,
+                'gc_hist': gc_hist,
+                'kmers': kmers,
+                'full': True}
+
+    def __score_delta(self, seq):
+        '''Scores a sequence from differences with the accepted sequence.'''
+        timings = self.__timings
+        old_seq = self.__state['seq']
+        scores = dict(self.__state['scores'])
+        gc_count = self.__state['gc_count']
+        gc_hist = np.zeros(self.__gc_var_window + 1, dtype=np.int64)
+        kmers = collections.Counter()
+
+        local_gc_window = self.__filters['local_gc_window']
+
+        for start, end in _get_changed_spans(old_seq, seq, 2 * self.__flank):
+            # Invalid sequences (sites overlapping span cancel elsewhere):
+            with timings.time('inv_seq'):
+                sub_start = max(0, start - self.__inv_flank)
+                sub_end = end + self.__inv_flank
+
+                scores['num_inv_seq'] += \
+                    self.__count_inv(seq[sub_start:sub_end]) - \
+                    self.__count_inv(old_seq[sub_start:sub_end])
+
+            # Global GC:
+            with timings.time('gc'):
+                gc_count += seq_metrics.count_gc(seq[start:end]) - \
+                    seq_metrics.count_gc(old_seq[start:end])
+
+            # Local GC, over all windows overlapping span:
+            with timings.time('local_gc'):
+                sub_start = max(0, start - local_gc_window + 1)
+                sub_end = end + local_gc_window - 1
+
+                scores['local_gc'] += \
+                    self.__count_local_gc(seq[sub_start:sub_end]) - \
+                    self.__count_local_gc(old_seq[sub_start:sub_end])
+
+            # GC variance, via histogram of window GC counts:
+            with timings.time('gc_var'):
+                sub_start = max(0, start - self.__gc_var_window + 1)
+                sub_end = end + self.__gc_var_window - 1
+
+                gc_hist += self.__get_gc_hist(seq[sub_start:sub_end]) - \
+                    self.__get_gc_hist(old_seq[sub_start:sub_end])
+
+            # Repeats:
+            with timings.time('repeats'):
+                sub_start = max(0, start - self.__repeat_window + 1)
+                sub_end = end + self.__repeat_window - 1
+
+                kmers.update(seq_metrics.get_kmers(
+                    seq[sub_start:sub_end], self.__repeat_window))
+                kmers.subtract(seq_metrics.get_kmers(
+                    old_seq[sub_start:sub_end], self.__repeat_window))
+
+        scores['gc'] = _get_gc(gc_count, seq)
+
+        with timings.time('gc_var'):
+            scores['gc_var'] = self.__get_gc_var(self.__state['gc_hist'] +
+                                                 gc_hist)
+
+        with timings.time('repeats'):
+            old_kmers = self.__state['kmers']
+
+            for kmer, delta in kmers.items():
+                if delta:
+                    count = old_kmers.get(kmer, 0)
+                    scores['repeats'] += _get_repeats(count + delta) - \
+                        _get_repeats(count)
+
+        return {'seq': seq,
+                'scores': scores,
+                'gc_count': gc_count,
+                'gc_hist': gc_hist,
+                'kmers': kmers,
+                'full': False}
+
+    def __count_inv(self, seq):
+        '''Counts invalid sequences.'''
+        return seq_metrics.count_invalid(seq,
+                                         self.__filters['max_repeats'],
+                                         self.__filters['restr_enzs'])
+
+    def __count_local_gc(self, seq):
+        '''Counts windows with GC content outside of the local GC range.'''
+        return seq_metrics.count_local_gc(seq,
+                                          self.__filters['local_gc_window'],
+                                          self.__filters['local_gc_min'],
+                                          self.__filters['local_gc_max'])
+
+    def __get_gc_hist(self, seq):
+        '''Gets histogram of window GC counts.'''
+        return np.bincount(seq_metrics.get_gc_counts(seq,
+                                                     self.__gc_var_window),
+                           minlength=self.__gc_var_window + 1)
+
+    def __get_gc_var(self, gc_hist):
+        '''Gets GC variance from a histogram of window GC counts.'''
+        counts = np.flatnonzero(gc_hist > 0)
+
+        if not counts.size:
+            return 0
+
+        window = float(self.__gc_var_window)
+
+        return 1 if int(counts[-1]) / window - int(counts[0]) / window > \
+            self.__gc_var_tol else 0
+
+
+def _get_inv_flank(max_repeats, restr_enzs):
+    '''Gets flank either side of a mutation within which invalid sequences
+    (and their cut sites) may be affected.'''
+    flank = 1
+
+    if max_repeats != float('inf'):
+        flank = max(flank, max_repeats + 1)
+
+    for restr_enz in restr_enzs:
+        enz = AllEnzymes.get(str(restr_enz))
+        flank = max(flank, enz.size + abs(enz.fst5 or 0) + abs(enz.fst3 or 0))
+
+    return flank
+
+
+def _get_changed_spans(old_seq, new_seq, min_gap, chunk=64):
+    '''Gets spans over which two equal-length sequences differ, merging those
+    separated by less than min_gap.'''
+    spans = []
+
+    for start in range(0, len(new_seq), chunk):
+        end = min(start + chunk, len(new_seq))
+
+        if old_seq[start:end] != new_seq[start:end]:
+            if spans and start - spans[-1][1] < min_gap:
+                spans[-1][1] = end
+            else:
+                spans.append([start, end])
+
+    return spans
+
+
+def _get_gc(gc_count, seq):
+    '''Get GC content.'''
+    return gc_count / float(len(seq))
+
+
+def _get_repeats(count):
+    '''Gets contribution of a window count to repeats.'''
+    return count if count > 1 else 0
@@ -0,0 +1,109 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import json
+import multiprocessing
+import os
+from threading import Event
+import unittest
+from unittest import mock
+
+from parts_genie import parts
+from parts_genie.parts import PartsSolution, PartsThread
+
+
+class _Listener():
+    '''Listener, recording events, and whether annealing has started (or
+    the job has ended).'''
+
+    def __init__(self):
+        self.events = []
+        self.started = Event()
+
+    def event_fired(self, event):
+        '''Responds to event being fired.'''
+        self.events.append(event)
+
+        if event['update']['message'] == 'Running...' or \
+                event['update']['status'] != 'running':
+            self.started.set()
+
+
+class TestPartsThreadChains(unittest.TestCase):
+    '''Test class for PartsThread, with multiple chains.'''
+
+    def test_run(self):
+        '''Tests run method, in which the job adopts the state of the best
+        chain.'''
+        get_best = parts._get_best
+        set_state = PartsSolution.set_state
+        best_energies = []
+        adopted_energies = []
+
+        def _get_best(statuses):
+            '''Gets index of best chain, recording its energy.'''
+            best = get_best(statuses)
+            best_energies.append(statuses[best][1])
+            return best
+
+        def _set_state(solution, state):
+            '''Sets state, recording its energy.'''
+            energy = set_state(solution, state)
+            adopted_energies.append(energy)
+            return energy
+
+        with mock.patch.object(parts, '_get_best', _get_best), \
+                mock.patch.object(PartsSolution, 'set_state', _set_state):
+            thread, listener = _start(_get_query('flat_simple_query.json'))
+            thread.join()
+
+        self.assertEqual(listener.events[-1]['update']['status'], 'finished')
+        self.assertTrue(listener.events[-1]['result'])
+
+        # State of best chain is adopted at each exchange and, once a chain
+        # is done, after the remaining chains halt:
+        self.assertEqual(adopted_energies,
+                         best_energies[:-2] + best_energies[-1:])
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_cancel(self):
+        '''Tests cancel method, which stops all chains.'''
+        thread, listener = _start(_get_query('flat_simple_query.json'))
+        self.assertTrue(listener.started.wait(600))
+        self.assertEqual(listener.events[-1]['update']['status'], 'running')
+
+        thread.cancel()
+        thread.join(60)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(listener.events[-1]['update']['status'],
+                         'cancelled')
+        self.assertEqual(multiprocessing.active_children(), [])
+
+
+def _start(query):
+    '''Starts job with two chains.'''
+    thread = PartsThread(query, idx=0, verbose=False, num_chains=2)
+    listener = _Listener()
+    thread.add_listener(listener)
+    thread.start()
+    return thread, listener
+
+
+def _get_query(filename):
+    '''Gets query.'''
+    directory = os.path.dirname(os.path.realpath(__file__))
+
+    with open(os.path.join(directory, filename)) as fle:
+        return json.load(fle)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,81 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import random
+import unittest
+
+from parts_genie.codon_seq import CodonSeq, get_codon_weights
+
+
+class _CodonOptimiser():
+    '''Minimal codon optimiser, with a fixed codon usage table.'''
+
+    __CODON_PROBS = {'M': [('ATG', 1.0)],
+                     'K': [('AAA', 0.75), ('AAG', 0.25)],
+                     'L': [('CTG', 0.5), ('TTA', 0.3), ('CTC', 0.2)],
+                     '*': [('TAA', 0.6), ('TGA', 0.4)]}
+
+    def get_all_codons(self, amino_acid):
+        '''Returns all codons for a given amino acid.'''
+        return [codon for codon, _ in self.__CODON_PROBS.get(amino_acid, [])]
+
+    def get_codon_prob(self, codon):
+        '''Gets the codon probability.'''
+        return [prob for codon_probs in self.__CODON_PROBS.values()
+                for cod, prob in codon_probs if cod == codon][0]
+
+    def get_random_codon(self, amino_acid):
+        '''Returns a random codon for a given amino acid.'''
+        return random.choice(self.get_all_codons(amino_acid))
+
+
+class TestCodonSeq(unittest.TestCase):
+    '''Test class for CodonSeq.'''
+
+    def test_mutate(self):
+        '''Tests mutate, accept and reject methods.'''
+        random.seed(0)
+        cod_opt = _CodonOptimiser()
+        weights = get_codon_weights(cod_opt)
+        aa_seq = 'MKLLKLKLLK*'
+        seq = ''.join(cod_opt.get_all_codons(amino_acid)[0]
+                      for amino_acid in aa_seq)
+        codon_seq = CodonSeq(cod_opt, aa_seq, seq, weights)
+
+        self.assertAlmostEqual(codon_seq.get_cai(), 1.0)
+
+        for _ in range(100):
+            old_seq = codon_seq.get_seq()
+            old_cai = codon_seq.get_cai()
+
+            changed = codon_seq.mutate(0.5)
+            new_seq = codon_seq.get_seq()
+
+            self.assertEqual(changed, new_seq != old_seq)
+            self.assertAlmostEqual(codon_seq.get_cai(),
+                                   _get_cai(new_seq, weights))
+
+            if random.random() < 0.5:
+                codon_seq.accept()
+            else:
+                codon_seq.reject()
+                self.assertEqual(codon_seq.get_seq(), old_seq)
+                self.assertEqual(codon_seq.get_cai(), old_cai)
+
+
+def _get_cai(seq, weights):
+    '''Gets CAI from scratch.'''
+    codon_weights = [weights[seq[idx:idx + 3]]
+                     for idx in range(0, len(seq), 3)]
+    return sum(codon_weights) / len(codon_weights)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
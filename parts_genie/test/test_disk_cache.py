@@ -0,0 +1,47 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import os
+import tempfile
+import unittest
+
+from parts_genie.disk_cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+    '''Test class for DiskCache.'''
+
+    def test_get(self):
+        '''Tests get method.'''
+        path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite')
+        cache = DiskCache(path)
+        key = ('mfe', ('ACGT', 'TTGA'), 'some', None)
+
+        self.assertIsNone(cache.get(key))
+        cache.put(key, [[-1.2], [[1]], [[4]]])
+
+        # Check values persist across instances:
+        self.assertEqual(DiskCache(path).get(key), [[-1.2], [[1]], [[4]]])
+
+    def test_prune(self):
+        '''Tests prune method.'''
+        path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite')
+        cache = DiskCache(path, max_size=2, prune_interval=3)
+
+        for idx in range(3):
+            cache.put(idx, idx)
+
+        self.assertIsNone(cache.get(0))
+        self.assertEqual(cache.get(1), 1)
+        self.assertEqual(cache.get(2), 2)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
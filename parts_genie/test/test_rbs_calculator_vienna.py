@@ -46,6 +46,48 @@ class TestRbsCalculator(unittest.TestCase):
         self.assertAlmostEqual(dgs[41][0], -6.088674036389431)
         self.assertAlmostEqual(dgs[74][0], 5.793940143051147)
 
+    def test_get_calc_dgs_parallel(self):
+        '''Tests calc_dgs method with worker processes.'''
+        r_rna = 'acctcctta'
+        m_rna = 'TTCTAGAGGGGGGATCTCCCCCCAAAAAATAAGAGGTACACATGACTAAAACTTTCA' + \
+            'AAGGCTCAGTATTCCCACTGAGCATGGTGTTGAAACTGTGAATGCCTTGATGACGTA'
+
+        dgs = RbsCalculator(r_rna, utils, num_workers=2).calc_dgs(m_rna)
+
+        self.assertEqual(list(dgs.items()),
+                         list(RbsCalculator(r_rna, utils,
+                                            num_workers=0).calc_dgs(
+                                                m_rna).items()))
+
+    def test_get_calc_dgs_key(self):
+        '''Tests calc_dgs method, reusing dGs of unchanged start codons.'''
+        r_rna = 'acctcctta'
+        calc = RbsCalculator(r_rna, utils)
+
+        m_rna = 'TTCTAGAGGGGGGATCTCCCCCCAAAAAATAAGAGGTACACATGACTAAAACTTTCA' + \
+            'AAGGCTCAGTATTCCCACTGAGCATGGTGTTGAAACTGTGAATGCCTTGATGACGTA'
+
+        calc.calc_dgs(m_rna, key=0)
+        m_rna = m_rna[:100] + 'ATG' + m_rna[103:]
+
+        self.assertEqual(calc.calc_dgs(m_rna, key=0),
+                         RbsCalculator(r_rna, utils).calc_dgs(m_rna))
+
+    def test_get_cache_stats(self):
+        '''Tests get_cache_stats method.'''
+        r_rna = 'acctcctta'
+        calc = RbsCalculator(r_rna, utils)
+
+        m_rna = 'TTCTAGAGGGGGGATCTCCCCCCAAAAAATAAGAGGTACACATGACTAAAACTTTCA' + \
+            'AAGGCTCAGTATTCCCACTGAG'
+
+        calc.calc_dgs(m_rna)
+        stats = calc.get_cache_stats()
+
+        calc.calc_dgs(m_rna)
+        self.assertEqual(calc.get_cache_stats()['misses'], stats['misses'])
+        self.assertEqual(calc.get_cache_stats()['evictions'], 0)
+
     def test_mfe_fail(self):
         '''Tests mfe method.'''
         m_rna = 'GCGGGAATTACACATGGCATGGACGAACTTTATAAATGA'
@@ -74,6 +116,17 @@ class TestRbsCalculator(unittest.TestCase):
 
         self.assertTrue(nt_in_r_rna)
 
+    def test_run_batch(self):
+        '''Tests run_batch method.'''
+        batch = [['GCGGGAATTACACATGGCATGGACGAACTTTATAAATGA'],
+                 ['AACCTAATTGATAGCGGCCTAGGACCCCCATCAAC']]
+
+        self.assertEqual(utils.run_batch('mfe', batch, temp=37.0,
+                                         dangles='all'),
+                         [utils.run('mfe', sequences, temp=37.0,
+                                    dangles='all')
+                          for sequences in batch])
+
     def test_subopt_fail(self):
         '''Tests subopt method.'''
         r_rna = 'CCC'
@@ -0,0 +1,54 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import unittest
+
+from synbiochem.utils import seq_utils
+
+from parts_genie import seq_metrics
+
+
+class TestSeqMetrics(unittest.TestCase):
+    '''Test class for seq_metrics.'''
+
+    def test_get_gc_counts(self):
+        '''Tests get_gc_counts method.'''
+        self.assertEqual(seq_metrics.get_gc_counts('AGCTTGCA', 3).tolist(),
+                         [2, 2, 1, 1, 2, 2])
+        self.assertEqual(seq_metrics.get_gc_counts('AGC', 4).tolist(), [])
+
+    def test_count_local_gc(self):
+        '''Tests count_local_gc method.'''
+        self.assertEqual(seq_metrics.count_local_gc('AAAAGGGG', 4, 0.25, 0.75),
+                         2)
+
+    def test_count_repeats(self):
+        '''Tests count_repeats method.'''
+        self.assertEqual(seq_metrics.count_repeats('ACGTAACGTA', 4), 4)
+        self.assertEqual(seq_metrics.count_repeats('ACGNAACGNA', 4), 4)
+        self.assertEqual(seq_metrics.count_repeats('ACGTACGT', 33), 0)
+
+    def test_count_invalid(self):
+        '''Tests count_invalid method.'''
+        seq = 'GGTCTCAAAAAAGAATTCNNACGATCGTACTTTTTTTTTTTTTTTTTTTTTTTTT' + \
+            'GAGACCGCTCTTCATG'
+        restr_enzs = ['BsaI', 'EcoRI', 'BaeI', 'SapI', 'NotI']
+
+        for max_repeats in [3, 5, float('inf')]:
+            self.assertEqual(seq_metrics.count_invalid(seq, max_repeats,
+                                                       restr_enzs),
+                             len(seq_utils.find_invalid(seq, max_repeats,
+                                                        restr_enzs)))
+
+        self.assertEqual(seq_metrics.count_invalid(seq, float('inf'), []), 0)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
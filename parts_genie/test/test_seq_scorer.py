@@ -0,0 +1,66 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import random
+import unittest
+
+from synbiochem.utils import seq_utils
+
+from parts_genie.seq_scorer import SeqScorer
+
+
+_FILTERS = {'max_repeats': 4,
+            'restr_enzs': ['BsaI', 'EcoRI'],
+            'local_gc_window': 50,
+            'local_gc_min': 0.25,
+            'local_gc_max': 0.65}
+
+
+class TestSeqScorer(unittest.TestCase):
+    '''Test class for SeqScorer.'''
+
+    def test_score(self):
+        '''Tests score method against scoring from scratch.'''
+        random.seed(0)
+        seq = ''.join(random.choice('ACGT') for _ in range(2000))
+        scorer = SeqScorer(seq, _FILTERS)
+
+        for _ in range(50):
+            new_seq = seq_utils.mutate_seq(seq, mutations=5)
+            scores = scorer.score(new_seq)
+
+            self.assertEqual(scores,
+                             SeqScorer(new_seq, _FILTERS).get_scores())
+
+            if random.random() < 0.5:
+                scorer.accept()
+                seq = new_seq
+            else:
+                scorer.reject()
+
+            self.assertEqual(scorer.get_scores(),
+                             SeqScorer(seq, _FILTERS).get_scores())
+
+    def test_score_length_change(self):
+        '''Tests score method with a sequence of different length.'''
+        seq = 'ACGT' * 100
+        scorer = SeqScorer(seq, _FILTERS)
+        new_seq = seq + 'GAATTC'
+
+        self.assertEqual(scorer.score(new_seq),
+                         SeqScorer(new_seq, _FILTERS).get_scores())
+
+        scorer.accept()
+
+        self.assertEqual(scorer.get_scores()['num_inv_seq'], 1)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
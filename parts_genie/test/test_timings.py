@@ -0,0 +1,64 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import unittest
+
+from parts_genie.timings import Timings
+
+
+class TestTimings(unittest.TestCase):
+    '''Test class for Timings.'''
+
+    def test_get(self):
+        '''Tests time, add and iterate methods.'''
+        timings = Timings(enabled=True, log_interval=0)
+
+        for _ in range(3):
+            timings.iterate()
+
+            with timings.time('tir'):
+                timings.add('vienna_utils.mfe', 0.5, 2, [35, 70])
+
+        result = timings.get()
+
+        self.assertEqual(result['iterations'], 3)
+        self.assertEqual(list(result['phases']), ['vienna_utils.mfe', 'tir'])
+        self.assertEqual(result['phases']['tir']['calls'], 3)
+        self.assertAlmostEqual(result['phases']['vienna_utils.mfe']['time'],
+                               1.5)
+        self.assertEqual(result['phases']['vienna_utils.mfe']['calls'], 6)
+        self.assertEqual(result['phases']['vienna_utils.mfe']['lengths'],
+                         {'64': 3, '128': 3})
+
+    def test_merge(self):
+        '''Tests merge method.'''
+        timings = Timings(enabled=True, log_interval=0)
+        timings.add('vienna_utils.mfe', 0.5, 1, [35])
+        timings.merge(timings.get())
+
+        result = timings.get()
+        self.assertAlmostEqual(result['phases']['vienna_utils.mfe']['time'],
+                               1.0)
+        self.assertEqual(result['phases']['vienna_utils.mfe']['lengths'],
+                         {'64': 2})
+
+    def test_disabled(self):
+        '''Tests that disabled timings collect nothing.'''
+        timings = Timings(enabled=False)
+        timings.iterate()
+
+        with timings.time('tir'):
+            timings.add('vienna_utils.mfe', 0.5, 1, [35])
+
+        self.assertEqual(timings.get(), {'iterations': 0, 'phases': {}})
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
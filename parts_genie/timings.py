@@ -0,0 +1,138 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+# pylint: disable=too-few-public-methods
+from collections import OrderedDict
+import json
+import logging
+import os
+import time
+
+
+# Whether timings are collected (disabled timings add negligible overhead):
+_ENABLED = os.environ.get('PARTS_GENIE_TIMINGS', '0') not in ('', '0')
+
+# Iterations between timings being logged (at debug level):
+_LOG_INTERVAL = int(os.environ.get('PARTS_GENIE_TIMINGS_LOG_INTERVAL', 1000))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Timings():
+    '''Cumulative wall times and call counts of named phases, with optional
+    histograms of sequence lengths (binned to powers of two).'''
+
+    def __init__(self, enabled=_ENABLED, log_interval=_LOG_INTERVAL):
+        self.__enabled = enabled
+        self.__log_interval = log_interval
+        self.__iterations = 0
+        self.__phases = OrderedDict()
+
+    def is_enabled(self):
+        '''Gets whether timings are collected.'''
+        return self.__enabled
+
+    def time(self, phase):
+        '''Times phase, as a context manager.'''
+        return _Timer(self, phase) if self.__enabled else _NULL_TIMER
+
+    def add(self, phase, elapsed, calls=1, lengths=None):
+        '''Adds elapsed time, calls and sequence lengths to phase.'''
+        if not self.__enabled:
+            return
+
+        timing = self.__phases.get(phase, None)
+
+        if timing is None:
+            timing = {'time': 0.0, 'calls': 0}
+            self.__phases[phase] = timing
+
+        timing['time'] += elapsed
+        timing['calls'] += calls
+
+        if lengths:
+            hist = timing.setdefault('lengths', {})
+
+            for length in lengths:
+                # Upper bound of power-of-two bin (keyed as a string, as JSON):
+                key = str(1 << max(0, length - 1).bit_length())
+                hist[key] = hist.get(key, 0) + 1
+
+    def iterate(self):
+        '''Counts an iteration, logging timings every log_interval
+        iterations.'''
+        if not self.__enabled:
+            return
+
+        self.__iterations += 1
+
+        if self.__log_interval and \
+                not self.__iterations % self.__log_interval:
+            _LOGGER.debug('Timings: %s', json.dumps(self.get()))
+
+    def merge(self, timings):
+        '''Merges timings, as returned by get, into these timings.'''
+        if not self.__enabled:
+            return
+
+        self.__iterations += timings['iterations']
+
+        for phase, timing in timings['phases'].items():
+            self.add(phase, timing['time'], timing['calls'])
+
+            if 'lengths' in timing:
+                hist = self.__phases[phase].setdefault('lengths', {})
+
+                for key, count in timing['lengths'].items():
+                    hist[key] = hist.get(key, 0) + count
+
+    def get(self):
+        '''Gets (a copy of) timings, with length histograms in order of
+        length.'''
+        phases = OrderedDict()
+
+        for phase, timing in self.__phases.items():
+            phases[phase] = dict(timing)
+
+            if 'lengths' in timing:
+                phases[phase]['lengths'] = OrderedDict(
+                    sorted(timing['lengths'].items(),
+                           key=lambda item: int(item[0])))
+
+        return {'iterations': self.__iterations, 'phases': phases}
+
+
+class _Timer():
+    '''Context manager, adding its elapsed time to a phase.'''
+
+    def __init__(self, timings, phase):
+        self.__timings = timings
+        self.__phase = phase
+        self.__start = None
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.__timings.add(self.__phase,
+                           time.perf_counter() - self.__start)
+
+
+class _NullTimer():
+    '''Context manager that times nothing.'''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
@@ -9,9 +9,25 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 '''
 # pylint: disable=no-member
 # pylint: disable=too-many-arguments
+from collections import OrderedDict
+from functools import partial
+from threading import Lock, local
+
 import RNA
 
 
+_DANGLES = {'none': 0, 'some': 1, 'all': 2}
+
+# Maximum number of fold compounds, per thread, reused for eval_structure:
+_FOLD_COMPOUND_CACHE_SIZE = 16
+
+# Model details, keyed by temperature and dangles:
+_MODELS = {}
+_MODELS_LOCK = Lock()
+
+_LOCAL = local()
+
+
 def run(cmd, sequences, temp, dangles, energy_gap=None, bp_x=None, bp_y=None):
     '''Runs ViennaRNA.'''
     sequences = [str(seq) for seq in sequences]
@@ -28,12 +44,36 @@ def run(cmd, sequences, temp, dangles, energy_gap=None, bp_x=None, bp_y=None):
     return None
 
 
+def run_batch(cmd, batch, temp, dangles, energy_gap=None, pool=None):
+    '''Runs ViennaRNA over a batch of sequence lists (or, for energy, of
+    (sequences, bp_x, bp_y) tuples), optionally across a worker pool, returning
+    results in batch order.'''
+    func = partial(_run_item, cmd, temp=temp, dangles=dangles,
+                   energy_gap=energy_gap)
+
+    if pool is None:
+        return [func(item) for item in batch]
+
+    return list(pool.map(func, batch))
+
+
+def get_version():
+    '''Gets ViennaRNA version.'''
+    return RNA.__version__
+
+
+def _run_item(cmd, item, temp, dangles, energy_gap):
+    '''Runs ViennaRNA on a batch item.'''
+    if cmd == 'energy':
+        sequences, bp_x, bp_y = item
+        return run(cmd, sequences, temp, dangles, bp_x=bp_x, bp_y=bp_y)
+
+    return run(cmd, item, temp, dangles, energy_gap)
+
+
 def _mfe(sequences, temp=37.0, dangles='some'):
     '''mfe.'''
-    model = RNA.md()
-    model.temperature = temp
-    model.dangles = _get_dangles(dangles)
-    result = RNA.fold_compound(sequences[0], model).mfe()
+    result = RNA.fold_compound(sequences[0], _get_model(temp, dangles)).mfe()
     bp_x, bp_y = _get_numbered_pairs(result[0])
 
     if bp_x and bp_y:
@@ -44,12 +84,9 @@ def _mfe(sequences, temp=37.0, dangles='some'):
 
 def _subopt(sequences, energy_gap, temp=37.0, dangles='some'):
     '''subopt.'''
-    model = RNA.md()
-    model.temperature = temp
-    model.dangles = _get_dangles(dangles)
-
-    results = \
-        RNA.fold_compound('&'.join(sequences), model).subopt(int(energy_gap))
+    results = RNA.fold_compound('&'.join(sequences),
+                                _get_model(temp, dangles)).subopt(
+                                    int(energy_gap))
 
     energies = []
     bp_xs = []
@@ -68,17 +105,60 @@ def _subopt(sequences, energy_gap, temp=37.0, dangles='some'):
 
 def _energy(sequences, bp_x, bp_y, temp=37.0, dangles='some'):
     '''energy.'''
-    model = RNA.md()
-    model.temperature = temp
-    model.dangles = _get_dangles(dangles)
     sequence = '&'.join(sequences)
     structure = _get_brackets([len(seq) for seq in sequences], bp_x, bp_y)
-    return RNA.fold_compound(sequence, model).eval_structure(structure)
+    return _get_eval_fold_compound(sequence, temp,
+                                   dangles).eval_structure(structure)
+
+
+def _get_model(temp, dangles):
+    '''Gets model details, which are created once per temperature and dangles
+    and are copied (not modified) by fold compounds.'''
+    key = (temp, dangles)
+    model = _MODELS.get(key)
+
+    if model is None:
+        with _MODELS_LOCK:
+            model = _MODELS.get(key)
+
+            if model is None:
+                model = RNA.md()
+                model.temperature = temp
+                model.dangles = _get_dangles(dangles)
+                _MODELS[key] = model
+
+    return model
+
+
+def _get_eval_fold_compound(sequence, temp, dangles):
+    '''Gets evaluation-only fold compound, reused while the same sequence is
+    evaluated against different structures.'''
+    fold_compounds = getattr(_LOCAL, 'fold_compounds', None)
+
+    if fold_compounds is None:
+        fold_compounds = OrderedDict()
+        _LOCAL.fold_compounds = fold_compounds
+
+    key = (sequence, temp, dangles)
+    fold_compound = fold_compounds.get(key)
+
+    if fold_compound is None:
+        fold_compound = RNA.fold_compound(sequence,
+                                          _get_model(temp, dangles),
+                                          RNA.OPTION_EVAL_ONLY)
+        fold_compounds[key] = fold_compound
+
+        if len(fold_compounds) > _FOLD_COMPOUND_CACHE_SIZE:
+            fold_compounds.popitem(last=False)
+    else:
+        fold_compounds.move_to_end(key)
+
+    return fold_compound
 
 
 def _get_dangles(dangles):
     '''Get dangles.'''
-    return 0 if dangles == 'none' else 1 if dangles == 'some' else 2
+    return _DANGLES.get(dangles, 2)
 
 
 def _get_numbered_pairs(bracket_str):
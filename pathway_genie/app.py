@@ -24,7 +24,7 @@ from synbiochem.utils.ice_utils import ICEClientFactory
 from synbiochem.utils.net_utils import NetworkError
 from werkzeug.utils import secure_filename
 
-from pathway_genie import export, ncbi_taxonomy_utils, pathway
+from pathway_genie import export, organism_index, pathway
 
 
 # Configuration:
@@ -39,19 +39,13 @@ APP.config.from_object(__name__)
 APP.config['MAX_CONTENT_LENGTH'] = 1024 * 1024 * 1024
 APP.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
 
-
-def _get_organisms():
-    '''Get all valid organisms (bacterial with codon usage tables).'''
-    organisms = seq_utils.get_codon_usage_organisms(expand=True, verbose=True)
-    bacterial_ids = ncbi_taxonomy_utils.get_taxonomy_ids('2', 'data')
-    valid_ids = set(organisms.values()).intersection(set(bacterial_ids))
-    return {name: tax_id for name, tax_id in organisms.items()
-            if tax_id in valid_ids}
+# Default maximum number of organisms returned by a search:
+_ORGANISMS_LIMIT = 100
 
 
 _ICE_CLIENT_FACTORY = ICEClientFactory()
 _MANAGER = pathway.PathwayGenie(_ICE_CLIENT_FACTORY)
-_ORGANISMS = _get_organisms()
+_ORGANISMS = organism_index.OrganismIndex()
 
 DEBUG = False
 TESTING = False
@@ -126,8 +120,11 @@ def get_organisms():
     data = [{'taxonomy_id': taxonomy_id,
              'name': name,
              'r_rna': 'acctccttt'}
-            for name, taxonomy_id in _ORGANISMS.items()
-            if query['term'].lower() in name.lower()]
+            for name, taxonomy_id in _ORGANISMS.search(
+                query['term'],
+                _get_int(query.get('limit', None), _ORGANISMS_LIMIT, 1,
+                         _ORGANISMS_LIMIT),
+                _get_int(query.get('offset', None), 0, 0))]
 
     return json.dumps(data)
 
@@ -217,6 +214,17 @@ def _connect_ice(req):
                                               data['ice']['password'])
 
 
+def _get_int(value, default, min_value, max_value=float('inf')):
+    '''Gets integer value (or default, if not an integer), clamped to the
+    range min_value, max_value.'''
+    try:
+        value = int(value)
+    except (OverflowError, TypeError, ValueError):
+        value = default
+
+    return int(min(max(value, min_value), max_value))
+
+
 def _save_export(dfs):
     '''Save export file, returning the url.'''
     file_id = str(uuid.uuid4()).replace('-', '_')
@@ -13,6 +13,7 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 from synbiochem.utils import dna_utils
 from synbiochem.utils.ice_utils import get_ice_id
 
+from ice import ice_cache
 import pandas as pd
 
 
@@ -51,15 +52,23 @@ def _export_dominoes(ice_client, data):
     design_id = '_'.join(list(set([plasmid['parameters']['Design id']
                                    for plasmid in data])))
 
-    all_parts = [ice_client.get_ice_entry(
-        entry['ice_ids']['plasmid']['ice_id']).get_metadata()['linkedParts']
-        for entry in data]
+    # Look up plasmids, then their (distinct) parts, concurrently:
+    all_parts = [ice_entry.get_metadata()['linkedParts']
+                 for ice_entry in ice_cache.get_ice_entries(
+                     ice_client,
+                     [entry['ice_ids']['plasmid']['ice_id']
+                      for entry in data])]
 
-    part_data = set([(part['partId'], part['name'], part['shortDescription'])
-                     for parts in all_parts for part in parts])
+    part_data = list(set([(part['partId'], part['name'],
+                           part['shortDescription'])
+                          for parts in all_parts for part in parts]))
 
-    parts = [list(part) + _get_ice_data(ice_client, part[0])
-             for part in part_data]
+    parts = [list(part) + _get_ice_data(ice_entry)
+             for part, ice_entry in zip(part_data,
+                                        ice_cache.get_ice_entries(
+                                            ice_client,
+                                            [part[0]
+                                             for part in part_data]))]
 
     dominoes_df = pd.DataFrame(parts, columns=['Part ID', 'Name',
                                                'Description', 'Sequence',
@@ -85,10 +94,8 @@ def _get_ice_id(link, idx):
     return None
 
 
-def _get_ice_data(ice_client, ice_id):
+def _get_ice_data(ice_entry):
     '''Get ICE data.'''
-    ice_entry = ice_client.get_ice_entry(ice_id)
-
     metadata = ice_entry.get_metadata()
 
     typ = None
@@ -0,0 +1,151 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+from collections import OrderedDict
+import json
+import os
+from threading import Condition
+import time
+
+
+# Maximum number of completed jobs retained in memory:
+_MAX_RESULTS = int(os.environ.get('PATHWAY_GENIE_MAX_RESULTS', 256))
+
+# Time, in seconds, for which completed jobs are retained in memory:
+_RESULT_TTL = float(os.environ.get('PATHWAY_GENIE_RESULT_TTL', 24 * 60 * 60))
+
+# Optional directory to which evicted results are written:
+_SPILL_DIR = os.environ.get('PATHWAY_GENIE_SPILL_DIR', None)
+
+
+class JobRegistry():
+    '''Registry of jobs and their status, retaining a bounded number of
+    completed jobs, which may be written to disk upon eviction.'''
+
+    def __init__(self, max_results=_MAX_RESULTS, ttl=_RESULT_TTL,
+                 spill_dir=_SPILL_DIR):
+        self.__max_results = max_results
+        self.__ttl = ttl
+        self.__spill_dir = spill_dir
+        self.__threads = {}
+        self.__status = {}
+        self.__versions = {}
+        self.__completed = OrderedDict()
+        self.__spilling = {}
+        self.__status_changed = Condition()
+
+        if spill_dir and not os.path.exists(spill_dir):
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def add(self, job_id, thread):
+        '''Adds job.'''
+        with self.__status_changed:
+            self.__threads[job_id] = thread
+            evicted = self.__evict()
+
+        self.__spill(evicted)
+
+    def get_thread(self, job_id):
+        '''Gets job thread, or None if job is unknown or evicted.'''
+        with self.__status_changed:
+            return self.__threads.get(job_id, None)
+
+    def set_status(self, job_id, event):
+        '''Sets job status, notifying those waiting for it.'''
+        with self.__status_changed:
+            self.__status[job_id] = event
+            self.__versions[job_id] = self.__versions.get(job_id, 0) + 1
+
+            if event['update']['status'] != 'running':
+                self.__completed[job_id] = time.time()
+                self.__completed.move_to_end(job_id)
+
+            evicted = self.__evict()
+            self.__status_changed.notify_all()
+
+        self.__spill(evicted)
+
+    def wait_for_status(self, job_id, version, timeout):
+        '''Waits, up to timeout seconds, for job status to be newer than
+        version, returning latest version and status (None if the job has no
+        status yet, or an error status if the job is unknown or expired).'''
+        with self.__status_changed:
+            self.__status_changed.wait_for(
+                lambda: self.__versions.get(job_id, 0) > version or
+                not self.__is_live(job_id),
+                timeout)
+
+            if job_id in self.__versions:
+                if job_id in self.__completed:
+                    # Retain recently-accessed completed jobs:
+                    self.__completed[job_id] = time.time()
+                    self.__completed.move_to_end(job_id)
+
+                return self.__versions[job_id], self.__status[job_id]
+
+            if job_id in self.__spilling:
+                return 1, self.__spilling[job_id]
+
+            if job_id in self.__threads:
+                return 0, None
+
+        return self.__get_spilled(job_id)
+
+    def __evict(self):
+        '''Evicts least-recently-used or expired completed jobs, returning
+        those to be written to disk.'''
+        expiry = time.time() - self.__ttl
+        evicted = []
+
+        while self.__completed and \
+                (len(self.__completed) > self.__max_results or
+                 next(iter(self.__completed.values())) < expiry):
+            job_id, _ = self.__completed.popitem(last=False)
+            event = self.__status.pop(job_id)
+            self.__versions.pop(job_id)
+            self.__threads.pop(job_id, None)
+
+            if self.__spill_dir:
+                # Retained until written, outside of the lock:
+                self.__spilling[job_id] = event
+                evicted.append((job_id, event))
+
+        return evicted
+
+    def __spill(self, evicted):
+        '''Writes evicted jobs to disk.'''
+        for job_id, event in evicted:
+            with open(self.__get_spill_filename(job_id), 'w') as fle:
+                json.dump(event, fle)
+
+            with self.__status_changed:
+                self.__spilling.pop(job_id, None)
+
+    def __is_live(self, job_id):
+        '''Returns whether job is running, or retained in memory.'''
+        return job_id in self.__versions or job_id in self.__threads or \
+            job_id in self.__spilling
+
+    def __get_spilled(self, job_id):
+        '''Gets version and status of job from disk if present, otherwise an
+        error status.'''
+        if self.__spill_dir is not None and \
+                os.path.exists(self.__get_spill_filename(job_id)):
+            with open(self.__get_spill_filename(job_id)) as fle:
+                return 1, json.load(fle)
+
+        return 1, {'job_id': job_id,
+                   'update': {'status': 'error',
+                              'message': 'Job not found or expired'}}
+
+    def __get_spill_filename(self, job_id):
+        '''Gets filename of written job result.'''
+        # Job ids are uuids, but ensure they cannot escape the directory:
+        return os.path.join(self.__spill_dir,
+                            os.path.basename(job_id) + '.json')
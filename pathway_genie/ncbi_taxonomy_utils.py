@@ -16,6 +16,9 @@ import tempfile
 import urllib
 
 
+TAXDUMP_FILENAME = 'taxdump.tar.gz'
+
+
 def get_taxonomy_ids(parent_id, out_dir):
     '''Get taxonomy ids.'''
     tree = _load(out_dir)
@@ -43,7 +46,7 @@ def _get_ncbi_taxonomy_files(out_dir):
     '''Downloads and extracts NCBI Taxonomy files.'''
     with tarfile.open(_get_file(out_dir), 'r:gz') as tr:
         temp_dir = tempfile.gettempdir()
-        tr.extractall(temp_dir)
+        tr.extract('nodes.dmp', temp_dir)
 
     return os.path.join(temp_dir, 'nodes.dmp')
 
@@ -53,12 +56,11 @@ def _get_file(out_dir):
     if not os.path.exists(out_dir):
         os.makedirs(out_dir)
 
-    filename = 'taxdump.tar.gz'
-    path = os.path.join(out_dir, filename)
+    path = os.path.join(out_dir, TAXDUMP_FILENAME)
 
     if not os.path.exists(path):
         url_dir = 'ftp://ftp.ncbi.nih.gov/pub/taxonomy/'
-        urllib.request.urlretrieve('%s%s' % (url_dir, filename), path)
+        urllib.request.urlretrieve('%s%s' % (url_dir, TAXDUMP_FILENAME), path)
 
     return path
 
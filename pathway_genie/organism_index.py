@@ -0,0 +1,200 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+# pylint: disable=invalid-name
+from array import array
+from collections import defaultdict
+from contextlib import closing
+import heapq
+import json
+import logging
+import os
+import sqlite3
+import sys
+from threading import Lock
+import uuid
+
+from synbiochem.utils import seq_utils
+
+from pathway_genie import ncbi_taxonomy_utils
+
+
+# Directory of source data and index:
+_DATA_DIR = 'data'
+
+_INDEX_FILENAME = 'organisms.sqlite'
+
+# NCBI Taxonomy id of bacteria:
+_BACTERIA_ID = '2'
+
+# Length of substrings indexed for search:
+_NGRAM_LEN = 3
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OrganismIndex():
+    '''Index of valid organisms (bacterial with codon usage tables), loaded
+    lazily from a file precomputed by build (which downloads source data, so
+    is run when deploying, with python -m pathway_genie.organism_index).'''
+
+    def __init__(self, out_dir=_DATA_DIR):
+        self.__out_dir = out_dir
+        self.__organisms = None
+        self.__names = None
+        self.__lower_names = None
+        self.__ngrams = None
+        self.__lock = Lock()
+
+    def get_organisms(self):
+        '''Gets dictionary of organism names to taxonomy ids.'''
+        self.__load()
+        return self.__organisms
+
+    def search(self, term, limit=None, offset=0):
+        '''Searches for organisms whose names contain term (ignoring case),
+        returning a page of (name, taxonomy id) tuples, ranked by whether
+        names, then words within names, start with term.'''
+        self.__load()
+        term = term.lower()
+
+        if len(term) < _NGRAM_LEN:
+            candidates = range(len(self.__names))
+        else:
+            # Only names containing the term's rarest n-gram may match:
+            candidates = min((self.__ngrams.get(term[i:i + _NGRAM_LEN], ())
+                              for i in range(len(term) - _NGRAM_LEN + 1)),
+                             key=len)
+
+        # Rank, then favour shorter names:
+        matches = ((_get_rank(self.__lower_names[idx], term),
+                    len(self.__names[idx]), idx)
+                   for idx in candidates
+                   if term in self.__lower_names[idx])
+
+        matches = sorted(matches) if limit is None \
+            else heapq.nsmallest(offset + limit, matches)
+
+        return [(self.__names[idx], self.__organisms[self.__names[idx]])
+                for _, _, idx in matches[offset:]]
+
+    def __load(self):
+        '''Loads index, if not already loaded.'''
+        with self.__lock:
+            if self.__organisms is not None:
+                return
+
+            filename = os.path.join(self.__out_dir, _INDEX_FILENAME)
+            signature = _read_signature(filename)
+
+            if signature is None:
+                raise ValueError('Organism index not built: ' + filename)
+
+            if signature != _get_signature(self.__out_dir):
+                _LOGGER.warning('Organism index out of date: %s', filename)
+
+            organisms = _load(filename)
+            names = list(organisms)
+            lower_names = [name.lower() for name in names]
+            ngrams = defaultdict(lambda: array('I'))
+
+            for idx, name in enumerate(lower_names):
+                for ngram in set(name[i:i + _NGRAM_LEN]
+                                 for i in range(len(name) - _NGRAM_LEN + 1)):
+                    ngrams[ngram].append(idx)
+
+            self.__names = names
+            self.__lower_names = lower_names
+            self.__ngrams = dict(ngrams)
+            self.__organisms = organisms
+
+
+def build(out_dir=_DATA_DIR):
+    '''Builds index, if absent or out of date, returning its filename.'''
+    filename = os.path.join(out_dir, _INDEX_FILENAME)
+
+    if _read_signature(filename) == _get_signature(out_dir):
+        return filename
+
+    organisms = seq_utils.get_codon_usage_organisms(expand=True, verbose=True)
+    bacterial_ids = set(ncbi_taxonomy_utils.get_taxonomy_ids(_BACTERIA_ID,
+                                                             out_dir))
+
+    # Write to temporary file and rename, so that concurrent readers (e.g.
+    # other server processes) never see a partial index:
+    tmp_filename = filename + '.' + str(uuid.uuid4())
+
+    with closing(sqlite3.connect(tmp_filename)) as conn:
+        with conn:
+            conn.execute('CREATE TABLE organisms '
+                         '(name TEXT PRIMARY KEY, taxonomy_id TEXT NOT NULL, '
+                         'bacterial INTEGER NOT NULL)')
+            conn.execute('CREATE TABLE meta '
+                         '(key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            conn.executemany('INSERT INTO organisms VALUES (?, ?, ?)',
+                             [(name, tax_id, tax_id in bacterial_ids)
+                              for name, tax_id in organisms.items()])
+            conn.execute('INSERT INTO meta VALUES (?, ?)',
+                         ('signature', _get_signature(out_dir)))
+
+    os.replace(tmp_filename, filename)
+
+    return filename
+
+
+def _get_rank(name, term):
+    '''Gets rank of name matching term (lower being better).'''
+    if name.startswith(term):
+        return 0
+
+    return 1 if (' ' + term) in name else 2
+
+
+def _load(filename):
+    '''Loads valid organisms from index.'''
+    with closing(sqlite3.connect(filename)) as conn:
+        return dict(conn.execute('SELECT name, taxonomy_id FROM organisms '
+                                 'WHERE bacterial = 1 ORDER BY rowid'))
+
+
+def _read_signature(filename):
+    '''Reads signature of source data from which index was built.'''
+    if not os.path.exists(filename):
+        return None
+
+    try:
+        with closing(sqlite3.connect(filename)) as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?',
+                               ('signature',)).fetchone()
+    except sqlite3.Error:
+        return None
+
+    return row[0] if row else None
+
+
+def _get_signature(out_dir):
+    '''Gets signature (sizes and modification times) of source data.'''
+    # Codon usage organisms are saved alongside synbiochem's seq_utils:
+    filenames = [os.path.join(os.path.dirname(
+        os.path.realpath(seq_utils.__file__)), 'expand.txt'),
+        os.path.join(out_dir, ncbi_taxonomy_utils.TAXDUMP_FILENAME)]
+
+    return json.dumps([[filename, os.path.getsize(filename),
+                        os.path.getmtime(filename)]
+                       if os.path.exists(filename) else [filename, None, None]
+                       for filename in filenames])
+
+
+def main(argv):
+    '''main method'''
+    build(*argv)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -7,23 +7,60 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 
 @author:  neilswainston
 '''
+# pylint: disable=broad-except
+# pylint: disable=global-statement
+# pylint: disable=too-few-public-methods
+# pylint: disable=too-many-arguments
+# pylint: disable=wrong-import-order
+from concurrent.futures import ProcessPoolExecutor
 import json
-from threading import Thread
+import multiprocessing
+from multiprocessing import util
+import os
+from threading import Lock, Thread
 import time
+import traceback
+import uuid
+
+from synbiochem.utils.ice_utils import ICEClientFactory
 
 import ice.ice
 from parts_genie.parts import PartsThread
 from pathway_genie import sbol_utils
+from pathway_genie.job_registry import JobRegistry
 from plasmid_genie.plasmid import PlasmidThread
 
 
+# Number of worker processes to run jobs (0 to run jobs sequentially, in
+# threads of the server process):
+_NUM_WORKERS = int(os.environ.get('PATHWAY_GENIE_NUM_WORKERS', 0))
+
+# Interval, in seconds, at which worker processes check for cancellation:
+_CANCEL_INTERVAL = 0.5
+
+_FINAL_STATUSES = ['finished', 'error', 'cancelled']
+
+# Minimum interval, in seconds, between progress updates of a job run in a
+# worker process:
+_PROGRESS_INTERVAL = 1.0
+
+# Interval, in seconds, at which idle progress streams are kept alive:
+_KEEP_ALIVE_INTERVAL = 15.0
+
+# ICEClientFactory of a worker process, shared by its jobs:
+_ICE_CLIENT_FACTORY = None
+
+
 class PathwayGenie():
     '''Class to run PathwayGenie application.'''
 
-    def __init__(self, ice_client_factory):
+    def __init__(self, ice_client_factory, num_workers=_NUM_WORKERS,
+                 job_registry=None):
         self.__ice_client_factory = ice_client_factory
-        self.__status = {}
-        self.__threads = {}
+        self.__num_workers = num_workers
+        self.__process_pool = None
+        self.__process_pool_lock = Lock()
+        self.__jobs = job_registry if job_registry else JobRegistry()
         self.__writers = {}
 
     def submit(self, data, taxonomy_id=None, sbol=False):
@@ -41,55 +78,86 @@ class PathwayGenie():
             job_id = thread.get_job_id()
             job_ids.append(job_id)
             thread.add_listener(self)
-            self.__threads[job_id] = thread
+            self.__jobs.add(job_id, thread)
 
-        # Start new Threads:
-        thread_pool = ThreadPool(threads)
-        thread_pool.start()
+        # Start new Threads (or run jobs in worker processes):
+        if self.__num_workers:
+            self.__get_process_pool().submit(threads)
+        else:
+            thread_pool = ThreadPool(threads)
+            thread_pool.start()
 
         return job_ids
 
     def get_progress(self, job_id):
-        '''Returns progress of job.'''
+        '''Returns progress of job, as updates while running and the full
+        status once complete.'''
         def _check_progress(job_id):
-            '''Checks job progress.'''
-            while (job_id not in self.__status or
-                    self.__status[job_id]['update']['status'] == 'running'):
-                time.sleep(1)
+            '''Checks job progress, waiting for it to change.'''
+            sent_version = 0
 
-                if job_id in self.__status:
-                    yield 'data:' + self.__get_response(job_id) + '\n\n'
+            while True:
+                version, event = self.__jobs.wait_for_status(
+                    job_id, sent_version, _KEEP_ALIVE_INTERVAL)
 
-            yield 'data:' + self.__get_response(job_id) + '\n\n'
+                if event is None or (version == sent_version and
+                                     event['update']['status'] == 'running'):
+                    # Keep idle stream alive (unknown or expired jobs end
+                    # the stream with an error status):
+                    yield ':\n\n'
+                    continue
+
+                sent_version = version
+
+                if event['update']['status'] != 'running':
+                    yield 'data:' + json.dumps(event) + '\n\n'
+                    return
+
+                yield 'data:' + json.dumps({'job_id': job_id,
+                                            'update': event['update']}) + \
+                    '\n\n'
 
         return _check_progress(job_id)
 
     def cancel(self, job_id):
         '''Cancels job.'''
-        self.__threads[job_id].cancel()
+        thread = self.__jobs.get_thread(job_id)
+
+        # Completed jobs may have been evicted:
+        if thread:
+            thread.cancel()
+
         return job_id
 
     def event_fired(self, event):
         '''Responds to event being fired.'''
-        self.__status[event['job_id']] = event
-
-    def __get_response(self, job_id):
-        '''Returns current progress for job id.'''
-        return json.dumps(self.__status[job_id])
+        self.__jobs.set_status(event['job_id'], event)
 
     def __get_threads(self, query):
-        '''Get threads.'''
+        '''Get threads (or, if run in worker processes, proxies of jobs).'''
         app = query.get('app', 'undefined')
 
         if app == 'PartsGenie':
-            return [PartsThread(query, idx)
-                    for idx in range(len(query['designs']))]
-        if app == 'PlasmidGenie':
-            return [PlasmidThread(query, self.__ice_client_factory)]
-        if app == 'save':
-            return [ice.ice.IceThread(query, self.__ice_client_factory)]
+            idxs = range(len(query['designs']))
+        elif app in ['PlasmidGenie', 'save']:
+            idxs = [None]
+        else:
+            raise ValueError('Unknown app: ' + app)
+
+        if self.__num_workers:
+            process_pool = self.__get_process_pool()
+            return [process_pool.get_proxy(query, idx) for idx in idxs]
+
+        return [_get_thread(query, idx, self.__ice_client_factory)
+                for idx in idxs]
 
-        raise ValueError('Unknown app: ' + app)
+    def __get_process_pool(self):
+        '''Gets ProcessPool, which is started upon first use.'''
+        with self.__process_pool_lock:
+            if self.__process_pool is None:
+                self.__process_pool = ProcessPool(self.__num_workers)
+
+            return self.__process_pool
 
 
 class ThreadPool(Thread):
@@ -105,6 +173,205 @@ class ThreadPool(Thread):
             thread.join()
 
 
+class ProcessPool():
+    '''Class to run jobs concurrently in a bounded pool of worker processes,
+    relaying their events to the server process.'''
+
+    def __init__(self, num_workers):
+        # Spawn, rather than fork, as the server process is threaded:
+        context = multiprocessing.get_context('spawn')
+        self.__manager = context.Manager()
+        self.__events = self.__manager.Queue()
+        self.__executor = ProcessPoolExecutor(num_workers, mp_context=context,
+                                              initializer=_init_worker)
+        self.__proxies = {}
+        self.__lock = Lock()
+
+        relay = Thread(target=self.__relay)
+        relay.daemon = True
+        relay.start()
+
+    def get_proxy(self, query, idx):
+        '''Gets proxy of a job.'''
+        return JobProxy(query, idx, self.__manager.Event())
+
+    def submit(self, proxies):
+        '''Submits jobs.'''
+        for proxy in proxies:
+            with self.__lock:
+                self.__proxies[proxy.get_job_id()] = proxy
+
+            future = self.__executor.submit(_run_job,
+                                            proxy.get_job_id(),
+                                            proxy.get_query(),
+                                            proxy.get_idx(),
+                                            self.__events,
+                                            proxy.get_cancel_event())
+
+            future.add_done_callback(self.__get_callback(proxy))
+
+    def __get_callback(self, proxy):
+        '''Gets callback, reporting failure of worker process.'''
+        def _callback(future):
+            '''Reports failure of worker process.'''
+            if future.exception() is not None:
+                self.__events.put((proxy.get_job_id(),
+                                   _get_error_event(proxy.get_query(),
+                                                    repr(future.exception()))))
+
+        return _callback
+
+    def __relay(self):
+        '''Relays events from worker processes to job proxies.'''
+        while True:
+            try:
+                job_id, event = self.__events.get()
+            except (EOFError, OSError):
+                # Manager has shut down, as the server process is exiting:
+                return
+
+            with self.__lock:
+                if event['update']['status'] in _FINAL_STATUSES:
+                    proxy = self.__proxies.pop(job_id, None)
+                else:
+                    proxy = self.__proxies.get(job_id, None)
+
+            if proxy:
+                proxy.fire_event(event)
+
+
+class JobProxy():
+    '''Proxy, in the server process, of a job run in a worker process.'''
+
+    def __init__(self, query, idx, cancel_event):
+        self.__job_id = str(uuid.uuid4())
+        self.__query = query
+        self.__idx = idx
+        self.__cancel_event = cancel_event
+        self.__listeners = set()
+
+    def get_job_id(self):
+        '''Gets job id.'''
+        return self.__job_id
+
+    def get_query(self):
+        '''Gets query.'''
+        return self.__query
+
+    def get_idx(self):
+        '''Gets index of design in query.'''
+        return self.__idx
+
+    def get_cancel_event(self):
+        '''Gets cancel event, shared with worker process.'''
+        return self.__cancel_event
+
+    def cancel(self):
+        '''Cancels the job.'''
+        self.__cancel_event.set()
+
+    def add_listener(self, listener):
+        '''Adds an event listener.'''
+        self.__listeners.add(listener)
+
+    def fire_event(self, event):
+        '''Passes event from worker process on to registered listeners.'''
+        event.update({'job_id': self.__job_id})
+
+        for listener in self.__listeners:
+            listener.event_fired(event)
+
+
+class _EventQueuer():
+    '''Listener, in a worker process, that queues events of a job.
+    Updates of running jobs (without their query) are queued at most every
+    _PROGRESS_INTERVAL seconds.'''
+
+    def __init__(self, job_id, events):
+        self.__job_id = job_id
+        self.__events = events
+        self.__last_queued = 0
+
+    def event_fired(self, event):
+        '''Responds to event being fired.'''
+        if event['update']['status'] == 'running':
+            now = time.time()
+
+            if now - self.__last_queued < _PROGRESS_INTERVAL:
+                return
+
+            self.__last_queued = now
+            event = {'update': event['update']}
+
+        self.__events.put((self.__job_id, event))
+
+
+class _WorkerIceClientFactory():
+    '''ICEClientFactory of a worker process, started upon first use (as its
+    thread delays the exit of the process) and closed as the process
+    exits.'''
+
+    def __init__(self):
+        self.__ice_client_factory = None
+
+    def get_ice_client(self, *args, **kwargs):
+        '''Gets ICE client.'''
+        if self.__ice_client_factory is None:
+            self.__ice_client_factory = ICEClientFactory()
+            util.Finalize(None, self.__ice_client_factory.close,
+                          exitpriority=10)
+
+        return self.__ice_client_factory.get_ice_client(*args, **kwargs)
+
+
+def _init_worker():
+    '''Initialises worker process.'''
+    global _ICE_CLIENT_FACTORY
+
+    # Worker processes cannot share the server's ICEClientFactory:
+    _ICE_CLIENT_FACTORY = _WorkerIceClientFactory()
+
+
+def _run_job(job_id, query, idx, events, cancel_event):
+    '''Runs job in worker process.'''
+    try:
+        thread = _get_thread(query, idx, _ICE_CLIENT_FACTORY)
+        thread.add_listener(_EventQueuer(job_id, events))
+        thread.start()
+
+        while thread.is_alive():
+            thread.join(_CANCEL_INTERVAL)
+
+            if cancel_event.is_set():
+                thread.cancel()
+    except Exception:
+        events.put((job_id, _get_error_event(query, traceback.format_exc())))
+
+
+def _get_thread(query, idx, ice_client_factory):
+    '''Gets job thread.'''
+    app = query.get('app', 'undefined')
+
+    if app == 'PartsGenie':
+        return PartsThread(query, idx)
+    if app == 'PlasmidGenie':
+        return PlasmidThread(query, ice_client_factory)
+    if app == 'save':
+        return ice.ice.IceThread(query, ice_client_factory)
+
+    raise ValueError('Unknown app: ' + app)
+
+
+def _get_error_event(query, message):
+    '''Gets error event.'''
+    return {'update': {'status': 'error',
+                       'message': message,
+                       'progress': 100,
+                       'iteration': 0,
+                       'max_iter': 0},
+            'query': query}
+
+
 def _get_query(filenames, taxonomy_id):
     '''Get query.'''
     query = sbol_utils.to_query(filenames[0], taxonomy_id)
@@ -0,0 +1,95 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+from threading import Barrier, Lock
+import unittest
+
+from synbiochem.utils import dna_utils
+from synbiochem.utils.ice_utils import ICEEntry
+
+from pathway_genie import export
+
+
+_PLASMIDS = {'SBC000001': ['SBC000011', 'SBC000012'],
+             'SBC000002': ['SBC000011', 'SBC000013'],
+             'SBC000003': ['SBC000012', 'SBC000013']}
+
+
+class _IceClient():
+    '''Stub ICE client, whose requests for entries of each type (plasmid or
+    part) must all be in flight together.'''
+
+    def __init__(self):
+        self.__barriers = {'PLASMID': Barrier(3, timeout=5),
+                           'PART': Barrier(3, timeout=5)}
+        self.__lock = Lock()
+        self.requests = []
+
+    def get_ice_entry(self, ice_id):
+        '''Gets ICE entry.'''
+        with self.__lock:
+            self.requests.append(ice_id)
+
+        typ = 'PLASMID' if ice_id in _PLASMIDS else 'PART'
+
+        # Raises BrokenBarrierError unless requests are concurrent:
+        self.__barriers[typ].wait()
+
+        linked_parts = [{'partId': part_id,
+                         'name': 'name' + part_id,
+                         'shortDescription': 'desc' + part_id}
+                        for part_id in _PLASMIDS.get(ice_id, [])]
+
+        return ICEEntry(dna=dna_utils.DNA(seq='ACGT' + ice_id[-1]),
+                        metadata={'type': typ,
+                                  'linkedParts': linked_parts,
+                                  'parameters': [{'name': 'Type',
+                                                  'value': typ}]})
+
+
+class TestExport(unittest.TestCase):
+    '''Test class for export.'''
+
+    def test_export_dominoes(self):
+        '''Tests export method, fetching each ICE entry once,
+        concurrently.'''
+        ice_client = _IceClient()
+
+        # Plasmid SBC000001 appears twice:
+        data = [{'typ': dna_utils.SO_PLASMID,
+                 'name': 'plasmid' + str(idx),
+                 'parameters': {'Design id': 'design'},
+                 'ice_ids': {'plasmid': {'ice_id': ice_id},
+                             'part': {'ice_id': 'SBC00010' + str(idx)}}}
+                for idx, ice_id in enumerate(['SBC000001', 'SBC000002',
+                                              'SBC000003', 'SBC000001'])]
+
+        dominoes_df, mapping_df = export.export(ice_client, data)
+
+        self.assertEqual(sorted(ice_client.requests),
+                         ['SBC000001', 'SBC000002', 'SBC000003',
+                          'SBC000011', 'SBC000012', 'SBC000013'])
+
+        self.assertEqual(dominoes_df.name, 'design_export')
+        self.assertEqual(dominoes_df.values.tolist(),
+                         [['SBC000011', 'nameSBC000011', 'descSBC000011',
+                           'ACGT1', 'PART'],
+                          ['SBC000012', 'nameSBC000012', 'descSBC000012',
+                           'ACGT2', 'PART'],
+                          ['SBC000013', 'nameSBC000013', 'descSBC000013',
+                           'ACGT3', 'PART']])
+
+        self.assertEqual(mapping_df.values.tolist(),
+                         [['plasmid' + str(idx), 'SBC00010' + str(idx)]
+                          for idx in range(4)])
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,122 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import json
+import os
+import tempfile
+from threading import Timer
+import time
+import unittest
+
+from pathway_genie.job_registry import JobRegistry
+
+
+class TestJobRegistry(unittest.TestCase):
+    '''Test class for JobRegistry.'''
+
+    def test_evict(self):
+        '''Tests eviction of least-recently-used completed jobs to disk.'''
+        spill_dir = tempfile.mkdtemp()
+        registry = JobRegistry(max_results=1, spill_dir=spill_dir)
+
+        for job_id in ['job1', 'job2']:
+            registry.add(job_id, job_id + '_thread')
+
+        registry.set_status('job1', _get_event('job1', 'finished'))
+        registry.set_status('job2', _get_event('job2', 'running'))
+
+        # Running jobs are not evicted:
+        self.assertEqual(registry.get_thread('job1'), 'job1_thread')
+        self.assertEqual(os.listdir(spill_dir), [])
+
+        registry.set_status('job2', _get_event('job2', 'finished'))
+
+        self.assertIsNone(registry.get_thread('job1'))
+        self.assertEqual(registry.get_thread('job2'), 'job2_thread')
+        self.assertEqual(os.listdir(spill_dir), ['job1.json'])
+
+        # Evicted job is read from disk:
+        self.assertEqual(registry.wait_for_status('job1', 0, 0),
+                         (1, _get_event('job1', 'finished')))
+        self.assertEqual(registry.wait_for_status('job2', 0, 0),
+                         (2, _get_event('job2', 'finished')))
+
+        with open(os.path.join(spill_dir, 'job1.json')) as fle:
+            self.assertEqual(json.load(fle), _get_event('job1', 'finished'))
+
+    def test_evict_expired(self):
+        '''Tests eviction of completed jobs past their time to live.'''
+        registry = JobRegistry(ttl=0.1)
+        registry.add('job1', 'job1_thread')
+        registry.set_status('job1', _get_event('job1', 'finished'))
+
+        self.assertEqual(registry.wait_for_status('job1', 0, 0),
+                         (1, _get_event('job1', 'finished')))
+
+        time.sleep(0.2)
+        registry.add('job2', 'job2_thread')
+
+        self.assertIsNone(registry.get_thread('job1'))
+        self.assertEqual(registry.wait_for_status('job1', 0, 0),
+                         (1, _get_error_event('job1')))
+
+    def test_wait_for_status(self):
+        '''Tests wait_for_status method.'''
+        registry = JobRegistry()
+        registry.add('job1', 'job1_thread')
+
+        # Job has no status yet:
+        self.assertEqual(registry.wait_for_status('job1', 0, 0), (0, None))
+
+        registry.set_status('job1', _get_event('job1', 'running'))
+
+        # Times out, returning latest status:
+        start = time.time()
+        self.assertEqual(registry.wait_for_status('job1', 1, 0.2),
+                         (1, _get_event('job1', 'running')))
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+        # Returns upon new status:
+        timer = Timer(0.1, registry.set_status,
+                      ['job1', _get_event('job1', 'finished')])
+        timer.start()
+
+        start = time.time()
+        self.assertEqual(registry.wait_for_status('job1', 1, 10),
+                         (2, _get_event('job1', 'finished')))
+        self.assertLess(time.time() - start, 5)
+        timer.join()
+
+    def test_wait_for_status_unknown(self):
+        '''Tests that wait_for_status returns at once for an unknown
+        job.'''
+        registry = JobRegistry()
+
+        start = time.time()
+        self.assertEqual(registry.wait_for_status('job1', 0, 10),
+                         (1, _get_error_event('job1')))
+        self.assertLess(time.time() - start, 5)
+
+
+def _get_event(job_id, status):
+    '''Gets event.'''
+    return {'job_id': job_id,
+            'update': {'status': status, 'progress': 100.0}}
+
+
+def _get_error_event(job_id):
+    '''Gets error event of unknown or expired job.'''
+    return {'job_id': job_id,
+            'update': {'status': 'error',
+                       'message': 'Job not found or expired'}}
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
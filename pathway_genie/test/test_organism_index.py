@@ -0,0 +1,130 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pathway_genie import ncbi_taxonomy_utils, organism_index
+
+
+_ORGANISMS = {'Escherichia coli': '562',
+              'Escherichia coli K-12': '83333',
+              'Shigella flexneri': '623',
+              'Bacillus subtilis': '1423',
+              'Homo sapiens': '9606'}
+
+_BACTERIAL_IDS = ['562', '83333', '623', '1423']
+
+
+class TestOrganismIndex(unittest.TestCase):
+    '''Test class for organism_index.'''
+
+    def setUp(self):
+        self.__out_dir = tempfile.mkdtemp()
+
+        # Fixture of NCBI Taxonomy source data:
+        self.__write_taxdump(b'taxdump')
+
+        self.__patches = [
+            mock.patch.object(organism_index.seq_utils,
+                              'get_codon_usage_organisms',
+                              return_value=_ORGANISMS),
+            mock.patch.object(organism_index.ncbi_taxonomy_utils,
+                              'get_taxonomy_ids',
+                              return_value=_BACTERIAL_IDS)]
+
+        self.__get_organisms = self.__patches[0].start()
+        self.__patches[1].start()
+
+    def tearDown(self):
+        for patch in self.__patches:
+            patch.stop()
+
+    def test_build(self):
+        '''Tests build method.'''
+        filename = organism_index.build(self.__out_dir)
+
+        # Temporary file is renamed to index:
+        self.assertEqual(sorted(os.listdir(self.__out_dir)),
+                         sorted([ncbi_taxonomy_utils.TAXDUMP_FILENAME,
+                                 os.path.basename(filename)]))
+
+        self.assertEqual(organism_index.OrganismIndex(
+            self.__out_dir).get_organisms(),
+            {name: tax_id for name, tax_id in _ORGANISMS.items()
+             if tax_id in _BACTERIAL_IDS})
+
+        # Index is reused while source data is unchanged:
+        self.assertEqual(organism_index.build(self.__out_dir), filename)
+        self.assertEqual(self.__get_organisms.call_count, 1)
+
+        # ...and rebuilt when it changes:
+        self.__write_taxdump(b'updated taxdump')
+        organism_index.build(self.__out_dir)
+        self.assertEqual(self.__get_organisms.call_count, 2)
+
+    def test_load(self):
+        '''Tests that the index is loaded, but not built, upon first use.'''
+        index = organism_index.OrganismIndex(self.__out_dir)
+
+        with self.assertRaises(ValueError):
+            index.search('co')
+
+        self.assertEqual(self.__get_organisms.call_count, 0)
+
+        organism_index.build(self.__out_dir)
+        self.__write_taxdump(b'updated taxdump')
+
+        # Out of date index is used until rebuilt:
+        with self.assertLogs(organism_index.__name__, 'WARNING'):
+            self.assertEqual(len(index.search('co')), 2)
+
+        self.assertEqual(self.__get_organisms.call_count, 1)
+
+    def test_search(self):
+        '''Tests search method.'''
+        organism_index.build(self.__out_dir)
+        index = organism_index.OrganismIndex(self.__out_dir)
+
+        # Names starting with term, then with words starting with term, then
+        # containing term, favouring shorter names:
+        self.assertEqual([name for name, _ in index.search('co')],
+                         ['Escherichia coli', 'Escherichia coli K-12'])
+        self.assertEqual([name for name, _ in index.search('s')],
+                         ['Shigella flexneri', 'Bacillus subtilis',
+                          'Escherichia coli', 'Escherichia coli K-12'])
+        self.assertEqual([name for name, _ in index.search('ESCH')],
+                         ['Escherichia coli', 'Escherichia coli K-12'])
+        self.assertEqual([name for name, _ in index.search('chia')],
+                         ['Escherichia coli', 'Escherichia coli K-12'])
+        self.assertEqual([name for name, _ in index.search('bac')],
+                         ['Bacillus subtilis'])
+
+        # Non-bacterial organisms are excluded:
+        self.assertEqual(index.search('sapiens'), [])
+
+        # Paging:
+        self.assertEqual(index.search('s', limit=2, offset=1),
+                         [('Bacillus subtilis', '1423'),
+                          ('Escherichia coli', '562')])
+        self.assertEqual(index.search('s', limit=2, offset=4), [])
+
+    def __write_taxdump(self, data):
+        '''Writes fixture of NCBI Taxonomy source data.'''
+        with open(os.path.join(self.__out_dir,
+                               ncbi_taxonomy_utils.TAXDUMP_FILENAME),
+                  'wb') as fle:
+            fle.write(data)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,158 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import json
+from queue import Queue
+from threading import Event, Timer
+import time
+import unittest
+from unittest import mock
+
+from pathway_genie import pathway
+from pathway_genie.job_registry import JobRegistry
+from pathway_genie.pathway import PathwayGenie
+from pathway_genie.utils import PathwayThread
+
+
+class _PathwayThread(PathwayThread):
+    '''Trivial job, firing many updates.'''
+
+    def run(self):
+        for iteration, _ in enumerate(self._query['designs']):
+            self._fire_designs_event('running', iteration, 'Running...')
+
+        self._results.append('result')
+        self._fire_designs_event('finished', len(self._query['designs']),
+                                 'Job completed')
+
+
+class TestPathwayGenie(unittest.TestCase):
+    '''Test class for PathwayGenie.'''
+
+    def test_get_progress(self):
+        '''Tests that progress is pushed as job status changes.'''
+        job_registry = JobRegistry()
+        pathway_genie = PathwayGenie(None, job_registry=job_registry)
+        job_registry.add('job1', None)
+        job_registry.set_status('job1', _get_event('job1', 'running', 0))
+        progress = pathway_genie.get_progress('job1')
+
+        self.assertEqual(next(progress),
+                         _get_data(_get_event('job1', 'running', 0)))
+
+        for iteration in range(1, 3):
+            timer = Timer(0.1, job_registry.set_status,
+                          ['job1', _get_event('job1', 'running', iteration)])
+            timer.start()
+
+            start = time.time()
+            self.assertEqual(next(progress),
+                             _get_data(_get_event('job1', 'running',
+                                                  iteration)))
+            self.assertLess(time.time() - start, 5)
+            timer.join()
+
+        # Final status is sent in full, ending the stream:
+        event = _get_event('job1', 'finished', 3)
+        event['query'] = {}
+        event['result'] = ['result']
+        job_registry.set_status('job1', event)
+
+        self.assertEqual(list(progress), [_get_data(event)])
+
+    def test_get_progress_keep_alive(self):
+        '''Tests that idle progress streams are kept alive.'''
+        job_registry = JobRegistry()
+        pathway_genie = PathwayGenie(None, job_registry=job_registry)
+        job_registry.add('job1', None)
+
+        with mock.patch.object(pathway, '_KEEP_ALIVE_INTERVAL', 0.1):
+            progress = pathway_genie.get_progress('job1')
+
+            # Job has no status yet:
+            self.assertEqual(next(progress), ':\n\n')
+
+            job_registry.set_status('job1', _get_event('job1', 'running', 0))
+
+            self.assertEqual(next(progress),
+                             _get_data(_get_event('job1', 'running', 0)))
+
+            start = time.time()
+            self.assertEqual(next(progress), ':\n\n')
+            self.assertGreaterEqual(time.time() - start, 0.1)
+
+    def test_get_progress_unknown(self):
+        '''Tests that progress of an unknown job ends with an error.'''
+        pathway_genie = PathwayGenie(None, job_registry=JobRegistry())
+        event = {'job_id': 'job1',
+                 'update': {'status': 'error',
+                            'message': 'Job not found or expired'}}
+
+        self.assertEqual(list(pathway_genie.get_progress('job1')),
+                         [_get_data(event)])
+
+    def test_process_pool(self):
+        '''Tests that events of jobs run in worker processes reach the job
+        registry.'''
+        job_registry = JobRegistry()
+        pathway_genie = PathwayGenie(None, num_workers=1,
+                                     job_registry=job_registry)
+
+        # Job fails in worker process, as its design is empty:
+        query = {'app': 'PartsGenie', 'designs': [{}]}
+
+        job_id = pathway_genie.submit(json.dumps(query))[0]
+        messages = list(pathway_genie.get_progress(job_id))
+        event = json.loads(messages[-1][len('data:'):])
+
+        self.assertEqual(event['job_id'], job_id)
+        self.assertEqual(event['update']['status'], 'error')
+        self.assertEqual(event['query'], query)
+        self.assertEqual(job_registry.wait_for_status(job_id, 0, 0),
+                         (1, event))
+
+    def test_run_job(self):
+        '''Tests that updates of jobs run in worker processes are throttled,
+        without their query, and final events are complete.'''
+        query = {'designs': [{}] * 100}
+        thread = _PathwayThread(query)
+        events = Queue()
+
+        with mock.patch.object(pathway, '_get_thread', return_value=thread):
+            pathway._run_job('job1', query, None, events, Event())
+
+        self.assertEqual(events.get(), ('job1', {'update': {
+            'status': 'running',
+            'message': 'Running...',
+            'progress': 0.0,
+            'iteration': 0,
+            'max_iter': 100}}))
+
+        job_id, event = events.get()
+        self.assertEqual(job_id, 'job1')
+        self.assertEqual(event['update']['status'], 'finished')
+        self.assertEqual(event['query'], query)
+        self.assertEqual(event['result'], ['result'])
+        self.assertTrue(events.empty())
+
+
+def _get_event(job_id, status, iteration):
+    '''Gets event.'''
+    return {'job_id': job_id,
+            'update': {'status': status, 'iteration': iteration}}
+
+
+def _get_data(event):
+    '''Gets server-sent event data.'''
+    return 'data:' + json.dumps(event) + '\n\n'
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -10,9 +10,12 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 # pylint: disable=wrong-import-order
 from __future__ import division
 
+import copy
+
 from synbiochem.utils import dna_utils, pairwise, seq_utils
 from synbiochem.utils.seq_utils import get_seq_by_melt_temp
 
+from ice import ice_cache
 from pathway_genie.utils import PathwayThread
 
 
@@ -92,9 +95,19 @@ class PlasmidThread(PathwayThread):
         self._fire_designs_event('running', iteration,
                                  'Extracting sequences from ICE...')
 
+        # Fetch each ICE entry once, however many designs share it:
+        ice_ids = list({ice_id: None
+                        for design in self._query['designs']
+                        for ice_id in design['design']
+                        if ice_id})
+
+        ice_entries = dict(zip(ice_ids,
+                               ice_cache.get_ice_entries(self.__ice_client,
+                                                         ice_ids)))
+
         for design in self._query['designs']:
             design['components'] = \
-                [self.__get_component(ice_id)
+                [_get_component(ice_entries[ice_id], ice_id)
                  for ice_id in design['design']
                  if ice_id]
 
@@ -102,13 +115,6 @@ class PlasmidThread(PathwayThread):
             self._fire_designs_event('running', iteration,
                                      'Extracting sequences from ICE...')
 
-    def __get_component(self, ice_id):
-        '''Gets a DNA component from ICE.'''
-        ice_entry = self.__ice_client.get_ice_entry(ice_id)
-        dna = ice_entry.get_dna()
-        dna['desc'] = ice_id
-        return dna
-
     def __get_domino(self, pair):
         '''Gets a domino from a pair of DNA objects.'''
         dna = dna_utils.concat([self.__get_domino_branch(pair[0], False),
@@ -139,6 +145,14 @@ class PlasmidThread(PathwayThread):
         return dna
 
 
+def _get_component(ice_entry, ice_id):
+    '''Gets a DNA component from an ICE entry.'''
+    # Copy, as an entry may be a component of several designs:
+    dna = copy.deepcopy(ice_entry.get_dna())
+    dna['desc'] = ice_id
+    return dna
+
+
 def _apply_restricts(dna, restr_enz):
     '''Apply restruction enzyme.'''
     if not restr_enz:
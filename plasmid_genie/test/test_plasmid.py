@@ -0,0 +1,105 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+from threading import Barrier, Lock
+import unittest
+
+from synbiochem.utils import dna_utils
+from synbiochem.utils.ice_utils import ICEEntry
+
+from plasmid_genie.plasmid import PlasmidThread
+
+
+_SEQS = {'SBC000001': 'ATGGCTAGCAAAGGAGAAGAACTTTTCACTGGAGTTGTCCCAATTC',
+         'SBC000002': 'TTGCTGACGTCAGCTCGATCGGATCCGCGTACGATCGTAGCTAGCA',
+         'SBC000003': 'GGTCTCAGCGTTACCGGTAAAGCTTGCATGCCTGCAGGTCGACTCT'}
+
+
+class _IceClient():
+    '''Stub ICE client, whose requests for entries must all be in flight
+    together.'''
+
+    def __init__(self):
+        self.__barrier = Barrier(len(_SEQS), timeout=5)
+        self.__lock = Lock()
+        self.requests = []
+        self.entries = {}
+
+    def get_ice_entry(self, ice_id):
+        '''Gets ICE entry.'''
+        with self.__lock:
+            self.requests.append(ice_id)
+
+        # Raises BrokenBarrierError unless requests are concurrent:
+        self.__barrier.wait()
+
+        entry = ICEEntry(dna=dna_utils.DNA(seq=_SEQS[ice_id], name=ice_id),
+                         metadata={'type': 'PART'})
+        self.entries[ice_id] = entry
+        return entry
+
+
+class _IceClientFactory():
+    '''Stub ICEClientFactory.'''
+
+    def __init__(self, ice_client):
+        self.__ice_client = ice_client
+
+    def get_ice_client(self, *_, **__):
+        '''Gets ICE client.'''
+        return self.__ice_client
+
+
+class TestPlasmidThread(unittest.TestCase):
+    '''Test class for PlasmidThread.'''
+
+    def test_run(self):
+        '''Tests run method, fetching each component once, concurrently.'''
+        ice_client = _IceClient()
+
+        # SBC000001 is a component of both designs:
+        query = {'ice': {'url': 'url', 'username': 'user',
+                         'password': 'password'},
+                 'designs': [{'name': 'design1',
+                              'design': ['SBC000001', 'SBC000002']},
+                             {'name': 'design2',
+                              'design': ['SBC000001', '', 'SBC000003']}],
+                 'design_id': 'design',
+                 'restr_enzs': [],
+                 'melt_temp': 60.0,
+                 'circular': True}
+
+        thread = PlasmidThread(query, _IceClientFactory(ice_client))
+        thread.run()
+
+        self.assertEqual(sorted(ice_client.requests), sorted(_SEQS))
+
+        comps = [design['components'] for design in query['designs']]
+
+        self.assertEqual([[comp['desc'] for comp in design_comps]
+                          for design_comps in comps],
+                         [['SBC000001', 'SBC000002'],
+                          ['SBC000001', 'SBC000003']])
+
+        # Each design has its own copy of each component:
+        self.assertEqual(comps[0][0]['seq'], _SEQS['SBC000001'])
+        self.assertIsNot(comps[0][0], comps[1][0])
+
+        for design_comps in comps:
+            for comp in design_comps:
+                self.assertIsNot(comp,
+                                 ice_client.entries[comp['desc']].get_dna())
+
+        # ...leaving cached entries unchanged:
+        self.assertIsNone(ice_client.entries['SBC000001'].get_dna()['desc'])
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
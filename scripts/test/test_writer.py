@@ -0,0 +1,191 @@
+'''
+PathwayGenie (c) GeneGenie Bioinformatics Ltd. 2018
+
+PathwayGenie is licensed under the MIT License.
+
+To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
+
+@author:  neilswainston
+'''
+import json
+import os
+import tempfile
+from threading import Event, Lock
+import time
+import unittest
+from unittest import mock
+
+from synbiochem.utils import dna_utils
+from synbiochem.utils.ice_utils import ICEEntry
+
+from scripts import writer
+
+
+_PARTS = ['SBC000001', 'SBC000002', 'SBC000003', 'SBC000004']
+
+
+class _IceClientFactory():
+    '''Stub ICEClientFactory.'''
+
+    def get_ice_client(self, *_, **__):
+        '''Gets ICE client.'''
+        return None
+
+    def close(self):
+        '''Closes ICE clients.'''
+
+
+class _IceEntryWriter():
+    '''Stub write_ice_entry, recording the parts written and failing to write
+    fail_id.'''
+
+    def __init__(self, fail_id=None):
+        self.__fail_id = fail_id
+        self.__lock = Lock()
+        self.written = []
+
+    def __call__(self, ice_client, ice_id1, ice_id2, *_):
+        if ice_id1 == self.__fail_id:
+            raise ValueError(ice_id1)
+
+        with self.__lock:
+            self.written.append(ice_id1)
+
+        return _get_ice_entry(int(ice_id1[3:]) + 100), \
+            _get_ice_entry(int(ice_id1[3:])), \
+            _get_ice_entry(int(ice_id2[3:]))
+
+
+class TestWriter(unittest.TestCase):
+    '''Test class for writer.'''
+
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__in_filename = os.path.join(self.__dir, 'in.csv')
+        self.__out_filename = os.path.join(self.__dir, 'out.csv')
+
+        with open(self.__in_filename, 'w') as fle:
+            fle.write('part,vector\n')
+
+            for part_id in _PARTS:
+                fle.write(part_id + ',SBC000010\n')
+
+        self.__patch = mock.patch.object(writer, 'ICEClientFactory',
+                                         _IceClientFactory)
+        self.__patch.start()
+
+    def tearDown(self):
+        self.__patch.stop()
+
+    def test_write(self):
+        '''Tests write method.'''
+        ice_entry_writer = _IceEntryWriter()
+        self.__write(ice_entry_writer)
+
+        self.assertEqual(sorted(ice_entry_writer.written), _PARTS)
+        self.__assert_output()
+
+    def test_write_resume(self):
+        '''Tests that rows in the journal are not written on rerun.'''
+        ice_entry_writer = _IceEntryWriter('SBC000003')
+
+        with self.assertRaises(ValueError):
+            self.__write(ice_entry_writer, num_workers=1)
+
+        # Later rows may have been written before the failure was handled:
+        written = ice_entry_writer.written
+        self.assertEqual(written[:2], _PARTS[:2])
+        self.assertEqual(self.__read_journal(),
+                         [str(_PARTS.index(part_id)) for part_id in written])
+
+        ice_entry_writer = _IceEntryWriter()
+        self.__write(ice_entry_writer)
+
+        self.assertEqual(sorted(ice_entry_writer.written + written), _PARTS)
+        self.__assert_output()
+
+    def test_write_retry(self):
+        '''Tests that failed rows are not journaled, and are retried.'''
+        ice_entry_writer = _IceEntryWriter('SBC000001')
+
+        with self.assertRaises(ValueError):
+            self.__write(ice_entry_writer, num_workers=1)
+
+        self.assertNotIn('0', self.__read_journal())
+
+        ice_entry_writer = _IceEntryWriter()
+        self.__write(ice_entry_writer)
+
+        self.assertIn(_PARTS[0], ice_entry_writer.written)
+        self.__assert_output()
+
+    def test_write_in_flight(self):
+        '''Tests that rows being written when a row fails are journaled.'''
+        ice_entry_writer = _IceEntryWriter()
+        started = Event()
+        failed = Event()
+
+        def write_ice_entry(ice_client, ice_id1, ice_id2, *args):
+            '''Writes first row slowly, failing second row while the first
+            is being written.'''
+            if ice_id1 == _PARTS[0]:
+                started.set()
+                failed.wait(5)
+                time.sleep(0.1)
+            elif ice_id1 == _PARTS[1]:
+                started.wait(5)
+                failed.set()
+                raise ValueError(ice_id1)
+
+            return ice_entry_writer(ice_client, ice_id1, ice_id2, *args)
+
+        with self.assertRaises(ValueError):
+            self.__write(write_ice_entry, num_workers=2)
+
+        written = ice_entry_writer.written
+        self.assertIn(_PARTS[0], written)
+        self.assertEqual(sorted(self.__read_journal()),
+                         sorted(str(_PARTS.index(part_id))
+                                for part_id in written))
+
+        ice_entry_writer = _IceEntryWriter()
+        self.__write(ice_entry_writer)
+
+        self.assertEqual(sorted(ice_entry_writer.written + written), _PARTS)
+        self.__assert_output()
+
+    def __write(self, write_ice_entry, num_workers=4):
+        '''Writes input file.'''
+        with mock.patch.object(writer, 'write_ice_entry', write_ice_entry):
+            writer.write(self.__in_filename, self.__out_filename,
+                         'url', 'username', 'password', 'PLASMID',
+                         ['part', 'vector'], 'group', write_seq=True,
+                         num_workers=num_workers)
+
+    def __read_journal(self):
+        '''Reads rows in journal.'''
+        with open(self.__out_filename + '.journal') as journal:
+            return [json.loads(line)['row'] for line in journal]
+
+    def __assert_output(self):
+        '''Asserts output file, in input order, and removal of journal.'''
+        with open(self.__out_filename) as fle:
+            self.assertEqual(
+                fle.read().splitlines(),
+                ['part,vector,PLASMID,part_seq,vector_seq'] +
+                [part_id + ',SBC000010,SBC%06d,ACGT%d,ACGT10' %
+                 (int(part_id[3:]) + 100, int(part_id[3:]))
+                 for part_id in _PARTS])
+
+        self.assertFalse(os.path.exists(self.__out_filename + '.journal'))
+
+
+def _get_ice_entry(ice_number):
+    '''Gets ICE entry.'''
+    return ICEEntry(dna=dna_utils.DNA(seq='ACGT' + str(ice_number)),
+                    metadata={'id': ice_number, 'type': 'PART'})
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
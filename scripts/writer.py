@@ -11,35 +11,126 @@ To view a copy of this license, visit <http://opensource.org/licenses/MIT/>.
 # pylint: disable=too-many-arguments
 # pylint: disable=too-many-locals
 # pylint: disable=wrong-import-order
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+import json
+import os
+
 from synbiochem.utils.ice_utils import ICEClientFactory
 
 from ice.ice import write_ice_entry
 import pandas as pd
 
 
+# Number of rows written concurrently:
+_NUM_WORKERS = int(os.environ.get('PATHWAY_GENIE_MAX_ICE_WRITES', 8))
+
+
 def write(in_filename, out_filename,
           ice_url, ice_username, ice_password,
-          typ, comp_columns, group_name, write_seq=False):
-    '''Write.'''
+          typ, comp_columns, group_name, write_seq=False,
+          num_workers=_NUM_WORKERS, journal_filename=None):
+    '''Write.
+
+    Each written row is appended to a journal (by default, out_filename
+    with a .journal suffix) as it completes, so that a failed or interrupted
+    run may be restarted without rewriting completed rows. The output file,
+    in input order, is written once all rows are written.'''
     df = pd.read_csv(in_filename)
 
+    if journal_filename is None:
+        journal_filename = out_filename + '.journal'
+
+    written = _read_journal(journal_filename)
+
     ice_client_factory = ICEClientFactory()
-    ice_client = ice_client_factory.get_ice_client(ice_url, ice_username,
-                                                   ice_password)
-    output = []
 
-    for _, row in df.iterrows():
-        ice_id1 = row[comp_columns[0]]
-        ice_id2 = row[comp_columns[1]]
-        product, comp1, comp2 = write_ice_entry(ice_client, ice_id1, ice_id2,
-                                                typ, write_seq, [group_name])
+    try:
+        ice_client = ice_client_factory.get_ice_client(ice_url, ice_username,
+                                                       ice_password)
+        group_names = [group_name] if group_name else []
+
+        with ThreadPoolExecutor(num_workers) as executor, \
+                open(journal_filename, 'a') as journal:
+            futures = {}
+
+            for idx, row in df.iterrows():
+                ice_ids = [str(row[column]) for column in comp_columns]
+                done = written.get(str(idx), None)
+
+                if done is None or done['ice_ids'] != ice_ids:
+                    futures[executor.submit(_write_row, ice_client, ice_ids,
+                                            typ, comp_columns, write_seq,
+                                            group_names)] = (idx, ice_ids)
+
+            pending = set(futures)
+
+            try:
+                for future in as_completed(futures):
+                    pending.discard(future)
+                    _journal_row(journal, written, futures[future],
+                                 future.result())
+            except BaseException:
+                # Cancel rows not yet started, and journal rows already being
+                # written, so that a restart does not write them again:
+                for future in pending:
+                    future.cancel()
+
+                for future in wait(pending).done:
+                    if not future.cancelled() and \
+                            future.exception() is None:
+                        _journal_row(journal, written, futures[future],
+                                     future.result())
 
-        output.append({typ: product.get_ice_id(),
-                       comp_columns[0] + '_seq': comp1.get_seq(),
-                       comp_columns[1] + '_seq': comp2.get_seq()})
+                raise
+    finally:
+        ice_client_factory.close()
 
     # Update dataframe:
+    output = [written[str(idx)]['output'] for idx in df.index]
     df = df.join(pd.DataFrame(output, index=df.index))
 
     df.to_csv(out_filename, index=False)
-    ice_client_factory.close()
+    os.remove(journal_filename)
+
+
+def _write_row(ice_client, ice_ids, typ, comp_columns, write_seq,
+               group_names):
+    '''Writes a row, returning its output values.'''
+    product, comp1, comp2 = write_ice_entry(ice_client, ice_ids[0],
+                                            ice_ids[1], typ, write_seq,
+                                            group_names)
+
+    return {typ: product.get_ice_id(),
+            comp_columns[0] + '_seq': comp1.get_seq(),
+            comp_columns[1] + '_seq': comp2.get_seq()}
+
+
+def _journal_row(journal, written, row, output):
+    '''Streams a written row to the journal.'''
+    idx, ice_ids = row
+    entry = {'row': str(idx), 'ice_ids': ice_ids, 'output': output}
+
+    journal.write(json.dumps(entry) + '\n')
+    journal.flush()
+    written[entry['row']] = entry
+
+
+def _read_journal(journal_filename):
+    '''Reads rows written by a previous run, keyed by row index.'''
+    written = {}
+
+    if os.path.exists(journal_filename):
+        with open(journal_filename, 'rb+') as journal:
+            end = 0
+
+            for line in journal:
+                if not line.endswith(b'\n'):
+                    # Discard a row truncated by an interrupted run:
+                    journal.truncate(end)
+                    break
+
+                entry = json.loads(line.decode('utf-8'))
+                written[entry['row']] = entry
+                end += len(line)
+
+    return written